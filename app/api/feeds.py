@@ -0,0 +1,86 @@
+from fastapi import APIRouter, HTTPException, Query, Request, Response, status
+
+from app.core.config import settings
+from app.modules.blogs.feeds import FeedFormat, RenderedDocument, feed_index
+from app.utils.http_cache import is_not_modified, not_modified, validator_headers
+
+# Served at the site root, not under /api/v1
+router = APIRouter(tags=["Feeds"])
+
+SITEMAP_MEDIA_TYPE = "application/xml"
+FEED_MEDIA_TYPES = {
+    "rss": "application/rss+xml",
+    "atom": "application/atom+xml",
+}
+
+
+def _xml_response(
+    request: Request, document: RenderedDocument, media_type: str
+) -> Response:
+    """Pre-rendered bytes, gzipped when accepted, with conditional GET"""
+    use_gzip = "gzip" in request.headers.get("accept-encoding", "")
+    # Each encoding is its own representation with its own strong ETag
+    etag = document.gzip_etag if use_gzip else document.etag
+    headers = {
+        "Cache-Control": f"public, max-age={settings.feed_max_age_seconds}",
+        "Vary": "Accept-Encoding",
+    }
+
+    # A removed post does not move Last-Modified: only If-None-Match counts
+    if is_not_modified(request, etag):
+        response = not_modified(etag, document.last_modified)
+        response.headers.update(headers)
+        return response
+
+    headers.update(validator_headers(etag, document.last_modified))
+    if use_gzip:
+        headers["Content-Encoding"] = "gzip"
+    return Response(
+        document.gzipped if use_gzip else document.body,
+        media_type=media_type,
+        headers=headers,
+    )
+
+
+# ----------------------
+# Sitemap
+# ----------------------
+@router.get("/sitemap.xml", response_class=Response)
+async def sitemap(request: Request):
+    """
+    Every published post; above sitemap_max_urls posts this is a sitemap
+    index pointing to /sitemap-1.xml, /sitemap-2.xml, ...
+    """
+    document = await feed_index.sitemap()
+    if document is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Sitemap not found",
+        )
+    return _xml_response(request, document, SITEMAP_MEDIA_TYPE)
+
+
+@router.get("/sitemap-{shard:int}.xml", response_class=Response)
+async def sitemap_shard(shard: int, request: Request):
+    document = await feed_index.sitemap(shard)
+    if document is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Sitemap not found",
+        )
+    return _xml_response(request, document, SITEMAP_MEDIA_TYPE)
+
+
+# ----------------------
+# Feed
+# ----------------------
+@router.get("/feed.xml", response_class=Response)
+async def feed(
+    request: Request,
+    feed_format: FeedFormat = Query(
+        "rss", alias="format", description="rss (RSS 2.0) or atom"
+    ),
+):
+    """Newest published posts as RSS 2.0 (default) or Atom"""
+    document = await feed_index.feed(feed_format)
+    return _xml_response(request, document, FEED_MEDIA_TYPES[feed_format])
@@ -3,6 +3,7 @@ from fastapi.security import HTTPAuthorizationCredentials
 
 from app.modules.auth.schema import (
     LoginRequest,
+    RefreshRequest,
     TokenResponse,
 )
 from app.modules.auth.service import AuthService
@@ -19,11 +20,10 @@ service = AuthService()
 )
 async def login(payload: LoginRequest):
     try:
-        token = await service.login(
+        return await service.login(
             payload.username,
             payload.password,
         )
-        return {"access_token": token}
     except ValueError:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -31,19 +31,54 @@ async def login(payload: LoginRequest):
         )
 
 
+@router.post(
+    "/refresh",
+    response_model=TokenResponse,
+)
+async def refresh(payload: RefreshRequest):
+    """
+    Exchange a refresh token for a new access/refresh pair (rotation)
+    """
+    try:
+        return await service.refresh(payload.refresh_token)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail=str(e),
+        )
+
+
 @router.post(
     "/logout",
     status_code=status.HTTP_200_OK
 )
-async def logout(credentials: HTTPAuthorizationCredentials = Depends(http_bearer)):
+async def logout(payload: RefreshRequest):
     """
-    Logout endpoint - revoke token by adding to blacklist
+    Logout endpoint - revoke the refresh token by adding to blacklist
     """
     try:
-        await service.logout(credentials.credentials)
+        await service.logout(payload.refresh_token)
         return {"message": "Successfully logged out"}
     except ValueError as e:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail=str(e),
         )
+
+
+@router.post(
+    "/logout-all",
+    status_code=status.HTTP_200_OK
+)
+async def logout_all(credentials: HTTPAuthorizationCredentials = Depends(http_bearer)):
+    """
+    Logout everywhere - revoke every token issued to the current user
+    """
+    try:
+        await service.logout_all(credentials.credentials)
+        return {"message": "Successfully logged out from all sessions"}
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail=str(e),
+        )
@@ -1,19 +1,37 @@
-from typing import List, Optional
+from typing import List, Literal, Optional
 
-from fastapi import APIRouter, Query, status, Depends
+from fastapi import APIRouter, Query, Request, status, Depends
+from fastapi.responses import StreamingResponse
 
 from app.modules.blogs.schema import (
     BlogCreate,
     BlogUpdate,
     BlogResponse,
+    BlogListResponse,
+    BlogSearchResponse,
 )
 from app.modules.blogs.service import BlogService
+from app.core.config import settings
+from app.core.database import WithTotal
 from app.core.dependencies import get_current_admin
+from app.utils import ndjson
+from app.utils.serialization import MongoJSONResponse
+from app.utils.http_cache import (
+    is_conditional,
+    is_not_modified,
+    not_modified,
+    validator_headers,
+)
 
 
 router = APIRouter()
 service = BlogService()
 
+
+def anonymous_staleness(request: Request, seconds: float) -> float:
+    """Anonymous (public) traffic tolerates bounded staleness"""
+    return 0 if "authorization" in request.headers else seconds
+
 # ----------------------
 # Create Blog (Admin)
 # ----------------------
@@ -26,7 +44,55 @@ service = BlogService()
     dependencies=[Depends(get_current_admin)],
 )
 async def create_blog(payload: BlogCreate):
-    return await service.create_blog(payload)
+    blog = await service.create_blog(payload)
+    return MongoJSONResponse(blog, status_code=status.HTTP_201_CREATED)
+
+
+# ----------------------
+# Bulk Import (Admin)
+# ----------------------
+@router.post(
+    "/import",
+    response_class=StreamingResponse,
+    dependencies=[Depends(get_current_admin)],
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {
+                ndjson.MEDIA_TYPE: {
+                    "schema": {
+                        "type": "string",
+                        "description": "One BlogCreate JSON object per line",
+                    }
+                }
+            },
+        }
+    },
+    responses={200: {"content": {ndjson.MEDIA_TYPE: {}}}},
+)
+async def import_blogs(request: Request):
+    """
+    Create many blogs from an NDJSON body (one BlogCreate per line)
+
+    The upload is read as a stream and written in batches; slugs are
+    generated as for single creates. The response is NDJSON with one
+    result per non-blank input line:
+
+    - `{"line": 1, "status": "created", "id": "...", "slug": "..."}`
+    - `{"line": 2, "status": "invalid" | "failed", "detail": ...}`
+
+    followed by `{"done": true, "created": n, "failed": n}`.
+    Match results to input by `line`: invalid lines are reported as soon
+    as they are read, the rest when their batch has been written.
+    """
+    lines = ndjson.iter_lines(request.stream(), settings.import_max_line_bytes)
+    # The whole upload is consumed before responding: results are spooled,
+    # not interleaved with the request body
+    results = await ndjson.spool(
+        service.import_blogs(lines, batch_size=settings.import_batch_size),
+        max_memory=settings.import_result_spool_bytes,
+    )
+    return StreamingResponse(ndjson.iter_file(results), media_type=ndjson.MEDIA_TYPE)
 
 
 # ----------------------
@@ -34,9 +100,11 @@ async def create_blog(payload: BlogCreate):
 # ----------------------
 @router.get(
     "",
-    response_model=dict,
+    response_model=BlogListResponse,
+    responses={304: {"description": "Not Modified (If-None-Match)"}},
 )
 async def list_blogs(
+    request: Request,
     published: Optional[bool] = Query(
         None,
         description="Filter by published status",
@@ -55,6 +123,25 @@ async def list_blogs(
     ),
     limit: int = Query(20, ge=1, le=100),
     skip: int = Query(0, ge=0),
+    cursor: Optional[str] = Query(
+        None,
+        description=(
+            "next_cursor from the previous page (faster than skip for deep pages)"
+        ),
+    ),
+    with_total: WithTotal = Query(
+        "exact",
+        description=(
+            "Total count: exact, estimated (cached, may lag) or none (only has_more)"
+        ),
+    ),
+    fields: str = Query(
+        "",
+        description=(
+            "Comma-separated fields to return, e.g. 'title,slug,content' "
+            "(default: all but content)"
+        ),
+    ),
 ):
     """
     List blogs with advanced filtering and sorting
@@ -71,14 +158,154 @@ async def list_blogs(
     - updated_date_desc: newest updated first
     - title_asc: A-Z (ก-ฮ)
     - title_desc: Z-A (ฮ-ก)
+
+    **Pagination:**
+    - cursor: pass `next_cursor` from the previous response; `skip` is
+      ignored when a cursor is given. `next_cursor` is null on the last page.
+    - with_total: `exact` (default), `estimated` or `none`; with `none`
+      `total` is null and `has_more` tells whether another page exists
+
+    **Fields:**
+    - Items omit `content` by default; use `fields` to pick exactly which
+      fields come back (e.g. `fields=title,slug,content`)
+
+    **Caching:**
+    - Responses carry an `ETag`; send it back as `If-None-Match` to get
+      `304 Not Modified` when the page is unchanged
+    - Anonymous requests may be served a cached page up to a few seconds
+      behind writes made through other workers
     """
-    return await service.list_blogs(
+    max_staleness = anonymous_staleness(
+        request, settings.list_cache_anonymous_staleness_seconds
+    )
+
+    page, etag, last_modified = await service.list_blogs(
         published=published,
         title=title,
         tags=tags,
         sort_by=sort_by,
         limit=limit,
         skip=skip,
+        cursor=cursor,
+        with_total=with_total,
+        fields=fields,
+        max_staleness=max_staleness,
+    )
+
+    # Last-Modified is informational only: a deleted post does not move it,
+    # so If-Modified-Since is not honored for lists
+    if is_not_modified(request, etag):
+        return not_modified(etag, last_modified)
+    return MongoJSONResponse(page, headers=validator_headers(etag, last_modified))
+
+
+# ----------------------
+# Search Blogs
+# ----------------------
+@router.get(
+    "/search",
+    response_model=BlogSearchResponse,
+)
+async def search_blogs(
+    q: str = Query(
+        ...,
+        min_length=1,
+        description="Search words; use \"quotes\" for phrases and -word to exclude",
+    ),
+    published: Optional[bool] = Query(
+        None,
+        description="Filter by published status",
+    ),
+    tags: str = Query(
+        "",
+        description="Filter by tags (comma-separated, e.g. 'python,webdev')",
+    ),
+    limit: int = Query(20, ge=1, le=100),
+    skip: int = Query(0, ge=0),
+    with_total: WithTotal = Query(
+        "exact",
+        description=(
+            "Total count: exact, estimated (cached, may lag) or none (only has_more)"
+        ),
+    ),
+    mode: Literal["text", "substring"] = Query(
+        "text",
+        description=(
+            "text: ranked word search; "
+            "substring: title/summary contains q (Thai-friendly)"
+        ),
+    ),
+):
+    """
+    Search blogs
+
+    **Modes:**
+    - text (default): full-text search over title, tags, summary and
+      content, sorted by relevance (`score`); matches in the title weigh
+      most, then tags, summary and content
+    - substring: title or summary contains `q` anywhere (case-insensitive),
+      newest first; works for languages without word spaces such as Thai
+    """
+    search = (
+        service.search_blogs_substring if mode == "substring" else service.search_blogs
+    )
+    return MongoJSONResponse(await search(
+        q=q,
+        published=published,
+        tags=tags,
+        limit=limit,
+        skip=skip,
+        with_total=with_total,
+    ))
+
+
+# ----------------------
+# Export Blogs (Admin)
+# ----------------------
+@router.get(
+    "/export",
+    response_class=StreamingResponse,
+    dependencies=[Depends(get_current_admin)],
+    responses={200: {"content": {ndjson.MEDIA_TYPE: {}}}},
+)
+async def export_blogs(
+    published: Optional[bool] = Query(
+        None,
+        description="Filter by published status",
+    ),
+    title: str = Query(
+        "",
+        description="Filter by title (case-insensitive)",
+    ),
+    tags: str = Query(
+        "",
+        description="Filter by tags (comma-separated, e.g. 'python,webdev')",
+    ),
+    after: Optional[str] = Query(
+        None,
+        description="Resume after this blog id (the id on the last line received)",
+    ),
+    gzip: bool = Query(
+        False,
+        description="Compress the body (Content-Encoding: gzip)",
+    ),
+):
+    """
+    Export every matching blog, content included, as NDJSON
+
+    One BlogResponse object per line in id order, streamed straight from
+    MongoDB. Filters are the same as for listing. If the download breaks
+    off, call again with `after` set to the id on the last complete line.
+    """
+    blogs = service.export_blogs(
+        published=published,
+        title=title,
+        tags=tags,
+        after=after,
+        batch_size=settings.export_batch_size,
+    )
+    return ndjson.stream_response(
+        blogs, gzip=gzip, gzip_level=settings.export_gzip_level
     )
 
 
@@ -88,9 +315,25 @@ async def list_blogs(
 @router.get(
     "/{blog_id}",
     response_model=BlogResponse,
+    responses={304: {"description": "Not Modified"}},
 )
-async def get_blog(blog_id: str):
-    return await service.get_blog_by_id(blog_id)
+async def get_blog(blog_id: str, request: Request):
+    max_staleness = anonymous_staleness(
+        request, settings.blog_cache_anonymous_staleness_seconds
+    )
+    # Revalidation only loads _id and timestamps, never the content
+    if is_conditional(request):
+        validators = await service.get_blog_validators(
+            blog_id=blog_id, max_staleness=max_staleness
+        )
+        if validators and is_not_modified(request, *validators):
+            return not_modified(*validators)
+
+    blog = await service.get_blog_by_id(blog_id, max_staleness=max_staleness)
+    validators = service.blog_validators(
+        blog["id"], blog["created_at"], blog["updated_at"]
+    )
+    return MongoJSONResponse(blog, headers=validator_headers(*validators))
 
 
 # ----------------------
@@ -99,9 +342,24 @@ async def get_blog(blog_id: str):
 @router.get(
     "/slug/{slug}",
     response_model=BlogResponse,
+    responses={304: {"description": "Not Modified"}},
 )
-async def get_blog_by_slug(slug: str):
-    return await service.get_blog_by_slug(slug)
+async def get_blog_by_slug(slug: str, request: Request):
+    max_staleness = anonymous_staleness(
+        request, settings.blog_cache_anonymous_staleness_seconds
+    )
+    if is_conditional(request):
+        validators = await service.get_blog_validators(
+            slug=slug, max_staleness=max_staleness
+        )
+        if validators and is_not_modified(request, *validators):
+            return not_modified(*validators)
+
+    blog = await service.get_blog_by_slug(slug, max_staleness=max_staleness)
+    validators = service.blog_validators(
+        blog["id"], blog["created_at"], blog["updated_at"]
+    )
+    return MongoJSONResponse(blog, headers=validator_headers(*validators))
 
 
 # ----------------------
@@ -116,7 +374,7 @@ async def update_blog(
     blog_id: str,
     payload: BlogUpdate,
 ):
-    return await service.update_blog(blog_id, payload)
+    return MongoJSONResponse(await service.update_blog(blog_id, payload))
 
 
 # ----------------------
@@ -0,0 +1,25 @@
+from fastapi import APIRouter, Depends
+
+from app.core.dependencies import get_current_admin
+from app.core.security import password_pool, token_cache
+from app.modules.auth.revocation import revocation_filter
+from app.modules.blogs.cache import blog_cache, blog_generation, list_cache
+from app.modules.blogs.feeds import feed_index
+
+router = APIRouter(prefix="/metrics", tags=["Metrics"])
+
+
+@router.get(
+    "",
+    dependencies=[Depends(get_current_admin)],
+)
+async def get_metrics():
+    """In-process cache and worker statistics (Admin only)"""
+    return {
+        "token_cache": token_cache.stats(),
+        "password_pool": password_pool.stats(),
+        "revocation_filter": revocation_filter.stats(),
+        "blog_cache": blog_cache.stats(),
+        "list_cache": {**list_cache.stats(), "generation": blog_generation.stats()},
+        "feeds": feed_index.stats(),
+    }
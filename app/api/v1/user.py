@@ -1,4 +1,7 @@
+from typing import Optional
+
 from fastapi import APIRouter, HTTPException, status, Depends, Query
+from fastapi.responses import StreamingResponse
 from bson import ObjectId
 from datetime import datetime, timezone
 from motor.motor_asyncio import AsyncIOMotorClient
@@ -9,10 +12,13 @@ from app.modules.users.schema import (
     UserResponse,
     UserListResponse,
 )
-from app.core.security import hash_password
 from app.modules.users.service import UserService
+from app.core.config import settings
+from app.core.database import WithTotal
 from app.core.dependencies import get_current_admin
+from app.utils import ndjson
 from app.utils.logger import init_logger
+from app.utils.serialization import MongoJSONResponse
 
 router = APIRouter(prefix="/users", tags=["Users"])
 service = UserService()
@@ -30,7 +36,6 @@ async def create_admin_account():
         "email": admin_username,
         "username": admin_username,
         "password": admin_password,
-        "hashedPassword": hash_password(admin_password),
         "is_admin": True,
         "is_active": True,
     }
@@ -53,7 +58,8 @@ async def create_user(
 ):
     """Create a new user (Admin only)"""
     try:
-        return await service.create_user(payload)
+        user = await service.create_user(payload)
+        return MongoJSONResponse(user, status_code=status.HTTP_201_CREATED)
     except ValueError as e:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -69,10 +75,55 @@ async def create_user(
 async def get_all_users(
     skip: int = Query(0, ge=0),
     limit: int = Query(20, ge=1, le=100),
+    with_total: WithTotal = Query(
+        "exact",
+        description=(
+            "Total count: exact, estimated (cached, may lag) or none (only has_more)"
+        ),
+    ),
     _: str = Depends(get_current_admin),  # require admin
 ):
     """Get all users (Admin only)"""
-    return await service.get_all_users(skip=skip, limit=limit)
+    page = await service.get_all_users(skip=skip, limit=limit, with_total=with_total)
+    return MongoJSONResponse(page)
+
+
+@router.get(
+    "/export",
+    response_class=StreamingResponse,
+    responses={200: {"content": {ndjson.MEDIA_TYPE: {}}}},
+)
+async def export_users(
+    user_status: Optional[str] = Query(
+        None,
+        alias="status",
+        description="Only users with this status, e.g. active (default: all)",
+    ),
+    after: Optional[str] = Query(
+        None,
+        description="Resume after this user id (the id on the last line received)",
+    ),
+    gzip: bool = Query(
+        False,
+        description="Compress the body (Content-Encoding: gzip)",
+    ),
+    _: str = Depends(get_current_admin),  # require admin
+):
+    """Export users as NDJSON, one UserResponse per line in id order (Admin only)"""
+    try:
+        users = service.export_users(
+            status=user_status,
+            after=after,
+            batch_size=settings.export_batch_size,
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e),
+        )
+    return ndjson.stream_response(
+        users, gzip=gzip, gzip_level=settings.export_gzip_level
+    )
 
 
 @router.get(
@@ -100,7 +151,7 @@ async def get_user(
             detail="User not found",
         )
 
-    return user
+    return MongoJSONResponse(user)
 
 
 @router.patch(
@@ -130,7 +181,7 @@ async def update_user(
                 detail="User not found",
             )
 
-        return user
+        return MongoJSONResponse(user)
     except ValueError as e:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -162,3 +213,28 @@ async def delete_user(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="User not found",
         )
+
+
+@router.post(
+    "/{user_id}/revoke-tokens",
+    status_code=status.HTTP_204_NO_CONTENT,
+)
+async def revoke_user_tokens(
+    user_id: str,
+    _: str = Depends(get_current_admin),  # require admin
+):
+    """Log a user out everywhere (Admin only)"""
+    # Validate ObjectId
+    if not ObjectId.is_valid(user_id):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid user ID",
+        )
+
+    success = await service.revoke_user_tokens(user_id)
+
+    if not success:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="User not found",
+        )
@@ -85,11 +85,77 @@ class Settings(BaseSettings):
     input_path: str = "input/"
     jwt_private_key_path: str = input_path + "keys/private_key.pem"
     jwt_public_key_path: str = input_path + "keys/public_key.pem"
-
-    # JWE Token Settings (RSA-OAEP-256 + A192GCM)
-    jwt_algorithm: str = "RSA-OAEP-256"  # JWE key encryption algorithm
+    jwt_secret_key_path: str = input_path + "keys/secret_key.json"
+    jwt_ec_private_key_path: str = input_path + "keys/ec_private_key.pem"
+    jwt_ec_public_key_path: str = input_path + "keys/ec_public_key.pem"
+
+    # JWE Token Settings
+    # rsa: RSA-OAEP-256, dir: shared AES key, ecdh: ECDH-ES (P-256)
+    token_format: Literal["rsa", "dir", "ecdh"] = "rsa"
+    # Extra formats still accepted on decode (migration window)
+    token_accept_formats: List[Literal["rsa", "dir", "ecdh"]] = Field(
+        default_factory=list
+    )
     jwt_encryption: str = "A192GCM"       # JWE content encryption algorithm
-    access_token_expire_minutes: int = 1440  # 24 hours
+    # Access tokens are checked statelessly, so keep them short-lived;
+    # refresh tokens are rotated and revocation-checked on /auth/refresh
+    access_token_expire_minutes: int = 15
+    refresh_token_expire_days: int = 14
+
+    # Verified token cache (skip JWE decrypt for repeat tokens)
+    token_cache_size: int = 4096
+    token_cache_ttl_seconds: int = 300
+
+    # Password hashing (bcrypt runs off the event loop)
+    bcrypt_rounds: int = 12
+    password_hash_executor: Literal["thread", "process"] = "thread"
+    password_hash_workers: int = 4
+
+    # Token revocation (in-memory filter of per-user epochs, synced from users)
+    revocation_sync_interval_seconds: int = 5
+    revocation_store_raw_token: bool = False  # keep full token for audit
+
+    # List totals (with_total=estimated)
+    list_count_cache_ttl_seconds: int = 30
+
+    # Blog read-through cache (get by id / slug), per process
+    blog_cache_size: int = 2048
+    blog_cache_max_bytes: int = 32 * 1024 * 1024
+    blog_cache_ttl_seconds: int = 60
+    blog_cache_negative_ttl_seconds: int = 10  # remembered 404s
+    # As list_cache_anonymous_staleness_seconds, for single blog reads
+    blog_cache_anonymous_staleness_seconds: float = 5
+
+    # Blog list result cache, invalidated by the blogs generation counter
+    list_cache_size: int = 512
+    list_cache_ttl_seconds: int = 300
+    # Anonymous requests may reuse this worker's last known generation for
+    # up to this long instead of reading it from MongoDB (0 = always read)
+    list_cache_anonymous_staleness_seconds: float = 5
+
+    # Bulk NDJSON import (POST /blogs/import)
+    import_batch_size: int = 500  # blogs per insert_many
+    import_max_line_bytes: int = 4 * 1024 * 1024
+    # Results are buffered until the upload is read, on disk past this
+    import_result_spool_bytes: int = 1024 * 1024
+
+    # NDJSON export (GET /blogs/export, /users/export)
+    export_batch_size: int = 1000  # documents per cursor round trip
+    export_gzip_level: int = 6
+
+    # Public site, for the links in /sitemap.xml and /feed.xml
+    public_base_url: str = "http://localhost:8000"
+    site_title: str = "MyBlog"
+    site_description: str = ""
+    post_path_template: str = "/blog/{slug}"
+    feed_size: int = 50  # newest posts per feed
+    sitemap_max_urls: int = 50_000  # per sitemap file (protocol limit)
+    # Sitemap/feeds may miss other workers' writes for up to this long
+    feed_sync_staleness_seconds: float = 5
+    # Deleted blog ids are kept this long for the sitemap to catch up on;
+    # a worker that last synced earlier than that reloads it in full
+    blog_tombstone_ttl_seconds: int = 7 * 24 * 3600
+    feed_max_age_seconds: int = 300  # Cache-Control for crawlers
 
     def validation_check(self) -> None:
         settings_dict = dict(self.model_dump().items())
@@ -102,7 +168,11 @@ class Settings(BaseSettings):
                     "\033[91mallow_origins ['*'] is only allowed for LOCAL\033[0m")
                 return False
 
-        if settings_dict["environment"] not in ["DEV", "LOCAL"]:
+        rsa_in_use = "rsa" in [
+            settings_dict["token_format"],
+            *settings_dict["token_accept_formats"],
+        ]
+        if settings_dict["environment"] not in ["DEV", "LOCAL"] and rsa_in_use:
             return compare_checksums(
                 settings_dict["jwt_private_key_path"],
                 settings_dict["jwt_public_key_path"],
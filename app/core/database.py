@@ -1,11 +1,23 @@
-from motor.motor_asyncio import AsyncIOMotorClient
+import asyncio
+from typing import Any, Literal, Optional
+
+from bson import json_util
+from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorCollection
 from app.core.config import settings
+from app.utils.cache import TTLCache
 from app.utils.logger import init_logger
 
 logger = init_logger(__name__)
 
 client: AsyncIOMotorClient | None = None
 
+# exact: exact count, in one $facet round trip with small first pages
+# estimated: cached count per filter (may lag behind by a few seconds)
+# none: no count, only has_more
+WithTotal = Literal["exact", "estimated", "none"]
+
+count_cache = TTLCache(maxsize=1024, ttl=settings.list_count_cache_ttl_seconds)
+
 
 def get_client() -> AsyncIOMotorClient:
     assert client is not None, "Mongo client not initialized"
@@ -16,16 +28,202 @@ def get_database():
     return get_client()[settings.mongo_db]
 
 
+async def estimated_count(
+    collection: AsyncIOMotorCollection,
+    query: dict,
+    collation: Optional[dict] = None,
+) -> int:
+    """Count matches, reusing a recent count for the same collection + filter"""
+    key = (
+        collection.name,
+        json_util.dumps(query, sort_keys=True),
+        json_util.dumps(collation, sort_keys=True),
+    )
+    total = count_cache.get(key)
+    if total is None:
+        if query:
+            options: dict[str, Any] = {"collation": collation} if collation else {}
+            total = await collection.count_documents(query, **options)
+        else:
+            total = await collection.estimated_document_count()
+        count_cache.set(key, total)
+    return total
+
+
+async def find_page(
+    collection: AsyncIOMotorCollection,
+    query: dict,
+    sort: list[tuple[str, Any]],
+    limit: int,
+    skip: int = 0,
+    after: Optional[dict] = None,
+    with_total: WithTotal = "exact",
+    projection: Optional[dict] = None,
+    collation: Optional[dict] = None,
+    large_items: bool = False,
+) -> tuple[list[dict], Optional[int], bool]:
+    """
+    Fetch one page of ``query`` plus its total according to ``with_total``
+    ``after`` narrows the page (e.g. a keyset condition) but not the total
+    ``projection`` limits the fields shipped back for each document
+    ``collation`` must match the collation of the index serving ``sort``
+    ``large_items``: documents may be big (e.g. carry a full body), so the
+    page is never gathered into one $facet result (16MB limit)
+    Returns: (docs, total or None, has_more)
+    """
+    options: dict[str, Any] = {"collation": collation} if collation else {}
+
+    if with_total == "exact" and not after and projection and not large_items:
+        # Count + page in one $facet round trip
+        # $match + $sort lead the pipeline so both can use an index
+        items: list[dict] = [{"$skip": skip}] if skip else []
+        items.append({"$limit": limit + 1})
+
+        pipeline = [
+            {"$match": query},
+            {"$sort": dict(sort)},
+            # Keep only the needed fields flowing into $facet
+            {"$project": projection},
+            {"$facet": {"total": [{"$count": "n"}], "items": items}},
+        ]
+        result = await collection.aggregate(pipeline, **options).to_list(length=1)
+        facet = result[0] if result else {"total": [], "items": []}
+        total = facet["total"][0]["n"] if facet["total"] else 0
+        docs = facet["items"]
+        has_more = len(docs) > limit
+        return docs[:limit], total, has_more
+
+    # The keyset condition goes into the find filter so the page is an
+    # index range scan; totals count the unnarrowed query
+    page_query = query
+    if after:
+        page_query = {"$and": [query, after]} if query else after
+
+    # One extra row tells whether another page exists
+    page = (
+        collection.find(page_query, projection, **options)
+        .sort(sort)
+        .skip(skip)
+        .limit(limit + 1)
+        .to_list(length=None)
+    )
+    total = None
+    if with_total == "exact":
+        docs, total = await asyncio.gather(
+            page, collection.count_documents(query, **options)
+        )
+    else:
+        docs = await page
+        if with_total == "estimated":
+            total = await estimated_count(collection, query, collation)
+
+    has_more = len(docs) > limit
+    return docs[:limit], total, has_more
+
+
+def plan_stages(plan) -> list[str]:
+    """Collect every stage name from an explain() plan tree"""
+    stages: list[str] = []
+    if isinstance(plan, dict):
+        if "stage" in plan:
+            stages.append(plan["stage"])
+        for value in plan.values():
+            stages.extend(plan_stages(value))
+    elif isinstance(plan, list):
+        for item in plan:
+            stages.extend(plan_stages(item))
+    return stages
+
+
+async def verify_query_plans(
+    collection_name: str,
+    shapes: dict,
+    forbidden: tuple[str, ...] = ("COLLSCAN",),
+) -> dict[str, list[str]]:
+    """
+    explain() each query shape (name -> Motor cursor) and warn about any
+    winning plan that contains a forbidden stage
+    Returns: name -> offending stages
+    """
+    problems: dict[str, list[str]] = {}
+    for name, cursor in shapes.items():
+        try:
+            explain = await cursor.explain()
+        except Exception as e:
+            logger.error(f"⚠️  explain() failed for {collection_name}.{name}: {e}")
+            continue
+
+        winning_plan = explain.get("queryPlanner", {}).get("winningPlan", {})
+        bad = [s for s in plan_stages(winning_plan) if s in forbidden]
+        if bad:
+            problems[name] = bad
+            logger.warning(
+                f"⚠️  {collection_name}.{name} runs with {', '.join(bad)}"
+            )
+
+    if not problems:
+        logger.debug(f"✅ All {collection_name} query shapes use indexes")
+    return problems
+
+
+async def migrate_token_blacklist(db) -> None:
+    """
+    Bring token_blacklist documents created by older versions in line
+    with the compact format: one document per jti, no raw token, and
+    a TTL that fires exactly at expires_at
+    """
+    collection = db.token_blacklist
+
+    # Drop duplicate jti documents so the unique index can be built
+    duplicates = collection.aggregate([
+        {"$group": {"_id": "$jti", "ids": {"$push": "$_id"}, "n": {"$sum": 1}}},
+        {"$match": {"n": {"$gt": 1}}},
+    ])
+    async for group in duplicates:
+        await collection.delete_many({"_id": {"$in": group["ids"][1:]}})
+
+    if not settings.revocation_store_raw_token:
+        result = await collection.update_many(
+            {"token": {"$exists": True}},
+            {"$unset": {"token": ""}},
+        )
+        if result.modified_count:
+            logger.info(
+                f"🧹 Removed raw tokens from {result.modified_count} blacklist entries"
+            )
+
+    # The old TTL index kept entries 2 days past expiry
+    indexes = await collection.index_information()
+    ttl_index = indexes.get("expires_at_1")
+    if ttl_index and ttl_index.get("expireAfterSeconds") != 0:
+        await db.command(
+            "collMod",
+            "token_blacklist",
+            index={"keyPattern": {"expires_at": 1}, "expireAfterSeconds": 0},
+        )
+
+
 async def init_indexes():
     """Initialize MongoDB indexes including TTL index for token blacklist"""
     db = get_database()
 
+    try:
+        await migrate_token_blacklist(db)
+    except Exception as e:
+        logger.error(f"⚠️  Error migrating token_blacklist: {e}")
+
+    # Revocation lookups by jti are a unique index point lookup
+    try:
+        await db.token_blacklist.create_index("jti", unique=True)
+    except Exception as e:
+        logger.error(f"⚠️  Error creating jti index: {e}")
+
     # Create TTL index on token_blacklist collection
-    # Auto delete expired tokens 2 days (172800 seconds) after expires_at
+    # Auto delete entries as soon as the revoked token itself expires
     try:
         await db.token_blacklist.create_index(
             "expires_at",
-            expireAfterSeconds=172800  # 2 days: 2 * 24 * 60 * 60
+            expireAfterSeconds=0,
         )
         logger.debug("✅ TTL Index created on token_blacklist collection")
     except Exception as e:
@@ -1,7 +1,7 @@
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 
-from app.core.security import decode_access_token
+from app.core.security import ACCESS_TOKEN, decode_access_token
 from app.modules.auth.repository import AuthRepository
 
 http_bearer = HTTPBearer()
@@ -14,23 +14,35 @@ async def get_current_admin(
         # Decode JWE token
         payload = decode_access_token(credentials.credentials)
 
-        jti = payload.get("jti")
         username: str = payload.get("sub")
 
-        # Check if token is blacklisted
-        if await AuthRepository.is_token_blacklisted(jti):
+        # Refresh tokens and tokens issued before uid/is_admin/typ claims
+        if payload.get("typ") != ACCESS_TOKEN or not payload.get("uid"):
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Not an access token, please log in again",
+            )
+
+        # Short-lived access tokens skip the blacklist; only the in-memory
+        # per-user epoch ("log out everywhere") is checked
+        if await AuthRepository.is_user_token_revoked(
+            payload["uid"], payload.get("iat", 0)
+        ):
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Token has been revoked",
             )
 
-        if username != "admin@example.com":
+        # Authorized from the token's own claim, no user lookup
+        if not payload.get("is_admin"):
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail="Not authorized",
             )
         return username
 
+    except HTTPException:
+        raise
     except ValueError as e:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
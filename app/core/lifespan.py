@@ -6,7 +6,10 @@ from motor.motor_asyncio import AsyncIOMotorClient
 from app.core.config import settings
 from app.core import database
 from app.core.database import init_indexes
+from app.core.security import password_pool
+from app.modules.auth.revocation import revocation_filter
 from app.modules.blogs.repository import BlogRepository
+from app.modules.users.repository import UserRepository
 from app.utils.logger import init_logger
 from app.api.v1 import user
 
@@ -34,11 +37,24 @@ async def lifespan(app: FastAPI):
         # Create indexes
         blog_repo = BlogRepository()
         await blog_repo.ensure_indexes()
+        backfilled = await blog_repo.backfill_search_grams()
+        if backfilled:
+            logger.info(f"🔤 Added search fields to {backfilled} blogs")
+        user_repo = UserRepository()
+        await user_repo.ensure_indexes()
         logger.info("📌 MongoDB indexes ensured")
 
+        # Make sure every list/lookup query shape is served by an index
+        await blog_repo.verify_indexes()
+        await user_repo.verify_indexes()
+
         # Initialize TTL indexes
         await init_indexes()
 
+        # Load revoked tokens and keep them in sync with other workers
+        await revocation_filter.load()
+        revocation_filter.start()
+
         if not settings.validation_check():
             raise RuntimeError("Invalid environment for DEV mode")
 
@@ -54,5 +70,7 @@ async def lifespan(app: FastAPI):
     # Shutdown
     # ---------------------
     logger.info("🛑 Shutting down application...")
+    await revocation_filter.stop()
+    password_pool.shutdown()
     database.client.close()
     logger.info("🛑 MongoDB disconnected")
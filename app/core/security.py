@@ -1,40 +1,86 @@
+import asyncio
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
 from passlib.context import CryptContext
 import uuid
-import json
+import hashlib
 from pathlib import Path
-from jwcrypto import jwk, jwe
+from jwcrypto import jwk
 
 from app.core.config import settings
+from app.core.tokens import TokenEngine, decode_token
+from app.utils.cache import TTLCache
 
 pwd_context = CryptContext(
     schemes=["bcrypt"],
     deprecated="auto",
+    bcrypt__rounds=settings.bcrypt_rounds,
 )
 
 
-# Load RSA keys from files
-def _load_keys():
-    """Load RSA keys from settings paths"""
-    private_key_path = Path(settings.jwt_private_key_path)
-    public_key_path = Path(settings.jwt_public_key_path)
+# Load token keys from files
+def _load_keys(*paths: str) -> list[Path]:
+    """Resolve key paths, failing with a hint when any is missing"""
+    key_paths = [Path(p) for p in paths]
+    missing = [p for p in key_paths if not p.exists()]
 
-    if not private_key_path.exists() or not public_key_path.exists():
+    if missing:
         raise ValueError(
-            f"UserModel!\n"
-            f"Expected:\n"
-            f"  - {private_key_path}\n"
-            f"  - {public_key_path}\n"
-            f"Run: python3 scripts/generate_rsa_keys.py"
+            "Token keys not found!\n"
+            "Expected:\n"
+            + "".join(f"  - {p}\n" for p in missing)
+            + "Run: python3 scripts/generate_rsa_keys.py --formats "
+            + " ".join(sorted({settings.token_format, *settings.token_accept_formats}))
         )
 
-    public_key = jwk.JWK.from_pem(public_key_path.read_bytes())
-    private_key = jwk.JWK.from_pem(private_key_path.read_bytes())
+    return key_paths
 
-    return public_key, private_key
 
+def _load_engine(name: str) -> TokenEngine:
+    """Build the engine for a token format from its configured key files"""
+    if name == "dir":
+        (secret_key_path,) = _load_keys(settings.jwt_secret_key_path)
+        secret_key = jwk.JWK.from_json(secret_key_path.read_text())
+        return TokenEngine(name, settings.jwt_encryption, secret_key)
 
-public_key, private_key = _load_keys()
+    if name == "ecdh":
+        private_key_path, public_key_path = _load_keys(
+            settings.jwt_ec_private_key_path,
+            settings.jwt_ec_public_key_path,
+        )
+    else:
+        private_key_path, public_key_path = _load_keys(
+            settings.jwt_private_key_path,
+            settings.jwt_public_key_path,
+        )
+
+    return TokenEngine(
+        name,
+        settings.jwt_encryption,
+        encryption_key=jwk.JWK.from_pem(public_key_path.read_bytes()),
+        decryption_key=jwk.JWK.from_pem(private_key_path.read_bytes()),
+    )
+
+
+def _load_engines() -> tuple[TokenEngine, dict[str, TokenEngine]]:
+    """Return (engine used to issue tokens, alg -> engine accepted on decode)"""
+    issuer = _load_engine(settings.token_format)
+    accepted = {issuer.alg: issuer}
+    for name in settings.token_accept_formats:
+        if name != issuer.name:
+            engine = _load_engine(name)
+            accepted[engine.alg] = engine
+    return issuer, accepted
+
+
+token_engine, accepted_engines = _load_engines()
+
+# Verified payloads keyed by token digest, so repeat requests with the
+# same token skip the private-key decrypt
+token_cache = TTLCache(
+    maxsize=settings.token_cache_size,
+    ttl=settings.token_cache_ttl_seconds,
+)
 
 
 def hash_password(password: str) -> str:
@@ -45,12 +91,99 @@ def verify_password(password: str, hashed: str) -> bool:
     return pwd_context.verify(password, hashed)
 
 
+class PasswordHashPool:
+    """
+    Runs bcrypt in a worker pool so it never blocks the event loop.
+    At most ``workers`` hashes run at once; the rest wait in queue.
+    """
+
+    def __init__(self, kind: str = "thread", workers: int = 4):
+        self.kind = kind
+        self.workers = max(1, workers)
+        self.queued = 0
+        self.running = 0
+        self.max_queued = 0
+        self.completed = 0
+        self._executor: Executor | None = None
+        self._semaphore: asyncio.Semaphore | None = None
+
+    def _get_executor(self) -> Executor:
+        if self._executor is None:
+            if self.kind == "process":
+                self._executor = ProcessPoolExecutor(max_workers=self.workers)
+            else:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.workers,
+                    thread_name_prefix="bcrypt",
+                )
+        return self._executor
+
+    async def run(self, func, *args):
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.workers)
+
+        self.queued += 1
+        self.max_queued = max(self.max_queued, self.queued)
+        try:
+            await self._semaphore.acquire()
+        finally:
+            self.queued -= 1
+
+        self.running += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._get_executor(), func, *args)
+        finally:
+            self.running -= 1
+            self.completed += 1
+            self._semaphore.release()
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+        self._semaphore = None
+
+    def stats(self) -> dict:
+        return {
+            "executor": self.kind,
+            "workers": self.workers,
+            "queued": self.queued,
+            "running": self.running,
+            "max_queued": self.max_queued,
+            "completed": self.completed,
+        }
+
+
+password_pool = PasswordHashPool(
+    kind=settings.password_hash_executor,
+    workers=settings.password_hash_workers,
+)
+
+
+async def hash_password_async(password: str) -> str:
+    return await password_pool.run(hash_password, password)
+
+
+async def verify_password_async(password: str, hashed: str) -> bool:
+    return await password_pool.run(verify_password, password, hashed)
+
+
+ACCESS_TOKEN = "access"
+REFRESH_TOKEN = "refresh"
+
+
 def create_access_token(
     subject: str,
     expires_minutes: int | None = None,
+    user_id: str | None = None,
+    is_admin: bool = False,
+    token_type: str = ACCESS_TOKEN,
 ) -> tuple[str, str, datetime]:
     """
-    Create JWE token with encryption (RSA-OAEP-256 + A192GCM)
+    Create JWE token with the configured token format
+    (default RSA-OAEP-256 + A192GCM)
+    Carries uid / is_admin so requests can be authorized without a user lookup
     Returns: (token, jti, expires_at)
     """
     expire = datetime.now(tz=timezone.utc) + timedelta(
@@ -64,23 +197,33 @@ def create_access_token(
         "exp": expire.timestamp(),
         "sub": subject,
         "jti": jti,
+        "typ": token_type,
+        "uid": user_id,
+        "is_admin": is_admin,
     }
 
     # Create JWE token (encrypted)
-    jwe_token = jwe.JWE(
-        plaintext=json.dumps(payload, ensure_ascii=False).encode("utf-8"),
-        protected={
-            "alg": settings.jwt_algorithm,      # RSA-OAEP-256
-            "enc": settings.jwt_encryption,     # A192GCM
-            "type": "JWE"
-        }
-    )
+    token = token_engine.encrypt(payload)
 
-    jwe_token.add_recipient(public_key)
+    return token, jti, expire
 
-    token = jwe_token.serialize(compact=True)
 
-    return token, jti, expire
+def create_refresh_token(
+    subject: str,
+    user_id: str,
+    is_admin: bool = False,
+) -> tuple[str, str, datetime]:
+    """
+    Create long-lived refresh token (only accepted by /auth/refresh)
+    Returns: (token, jti, expires_at)
+    """
+    return create_access_token(
+        subject=subject,
+        expires_minutes=settings.refresh_token_expire_days * 24 * 60,
+        user_id=user_id,
+        is_admin=is_admin,
+        token_type=REFRESH_TOKEN,
+    )
 
 
 def decode_access_token(token: str) -> dict:
@@ -89,18 +232,24 @@ def decode_access_token(token: str) -> dict:
     Returns: payload dict
     Raises: Exception if invalid
     """
-    try:
-        jwe_token = jwe.JWE()
-        jwe_token.deserialize(token)
-        jwe_token.decrypt(private_key)
+    cache_key = hashlib.sha256(token.encode("utf-8")).digest()
+    cached = token_cache.get(cache_key)
+    if cached is not None:
+        return dict(cached)
 
-        payload = json.loads(jwe_token.payload.decode('utf-8'))
+    try:
+        # Any accepted format decodes, so formats can be rotated
+        payload = decode_token(token, accepted_engines)
 
         # Check expiration
         exp = payload.get("exp")
         if exp and datetime.now(tz=timezone.utc).timestamp() > exp:
             raise ValueError("Token has expired")
-
-        return payload
     except Exception as e:
         raise ValueError(f"Invalid token: {str(e)}")
+
+    # Never keep a payload past the token's own expiry
+    ttl = exp - datetime.now(tz=timezone.utc).timestamp() if exp else None
+    token_cache.set(cache_key, payload, ttl=ttl)
+
+    return dict(payload)
@@ -1,4 +1,5 @@
 from datetime import datetime
+from typing import Optional
 from pydantic import BaseModel, Field
 from bson import ObjectId
 
@@ -7,7 +8,7 @@ class TokenBlacklistModel(BaseModel):
     """MongoDB Token Blacklist Document Schema"""
     id: ObjectId = Field(default_factory=ObjectId, alias="_id")
     jti: str = Field(..., unique=True, index=True)  # JWT ID
-    token: str  # Full token for reference
+    token: Optional[str] = None  # Only kept when revocation_store_raw_token is set
     revoked_at: datetime = Field(default_factory=datetime.utcnow)
     expires_at: datetime  # Auto cleanup after expiration
     user_id: ObjectId  # Reference to user
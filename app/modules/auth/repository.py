@@ -1,30 +1,57 @@
-from datetime import datetime
+from datetime import datetime, timezone
 from bson import ObjectId
+from app.core.config import settings
 from app.core.database import get_database
+from app.modules.auth.revocation import revocation_filter
 
 
 class AuthRepository:
     """Data access layer for authentication operations"""
 
     @staticmethod
-    async def blacklist_token(jti: str, token: str, expires_at: datetime, user_id: ObjectId) -> None:
-        """Add token to blacklist"""
+    async def blacklist_token(
+        jti: str,
+        expires_at: datetime,
+        user_id: ObjectId,
+        token: str | None = None,
+    ) -> bool:
+        """
+        Add token to blacklist
+        Returns: True if newly revoked, False if it already was
+        """
         db = get_database()
         blacklist_doc = {
             "jti": jti,
-            "token": token,
             "revoked_at": datetime.utcnow(),
             "expires_at": expires_at,
             "user_id": user_id,
         }
-        await db.token_blacklist.insert_one(blacklist_doc)
+        if token and settings.revocation_store_raw_token:
+            blacklist_doc["token"] = token
+
+        # Upsert on the unique jti index keeps revocation idempotent
+        result = await db.token_blacklist.update_one(
+            {"jti": jti},
+            {"$setOnInsert": blacklist_doc},
+            upsert=True,
+        )
+        return result.upserted_id is not None
 
     @staticmethod
-    async def is_token_blacklisted(jti: str) -> bool:
-        """Check if token is blacklisted"""
+    async def is_user_token_revoked(user_id: str, issued_at: float) -> bool:
+        """Check the token against the user's tokens_valid_after epoch"""
+        if revocation_filter.loaded:
+            return revocation_filter.is_user_revoked(user_id, issued_at)
+
         db = get_database()
-        result = await db.token_blacklist.find_one({"jti": jti})
-        return result is not None
+        user = await db.users.find_one(
+            {"_id": ObjectId(user_id)},
+            {"tokens_valid_after": 1},
+        )
+        valid_after = user.get("tokens_valid_after") if user else None
+        if valid_after is None:
+            return False
+        return issued_at < valid_after.replace(tzinfo=timezone.utc).timestamp()
 
     @staticmethod
     async def cleanup_expired_tokens() -> None:
@@ -0,0 +1,128 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+from app.core.config import settings
+from app.core.database import get_database
+from app.utils.logger import init_logger
+
+logger = init_logger(__name__)
+
+
+class RevocationFilter:
+    """
+    In-memory mirror of per-user token revocations.
+
+    Tracks the ``tokens_valid_after`` epochs of users. Loaded once at
+    startup, updated locally when this worker revokes something, and kept
+    in sync with other workers by polling for newer timestamps. Checks
+    never touch MongoDB.
+
+    Single refresh tokens revoked through token_blacklist are not mirrored:
+    rotation and logout check them with the upsert on the unique jti index.
+    """
+
+    def __init__(self, sync_interval: float = 5.0, overlap_seconds: float = 30.0):
+        self.sync_interval = sync_interval
+        # Re-read a short window behind the high-water mark so updates from
+        # workers with slightly skewed clocks are not missed
+        self.overlap = timedelta(seconds=overlap_seconds)
+        self.loaded = False
+        self.syncs = 0
+        # user_id -> unix time before which the user's tokens are invalid
+        self._valid_after: dict[str, float] = {}
+        self._users_high_water: datetime | None = None
+        self._task: asyncio.Task | None = None
+
+    def revoke_user(self, user_id: str, valid_after: datetime) -> None:
+        """Invalidate every token of user_id issued before valid_after (naive UTC)"""
+        epoch = valid_after.replace(tzinfo=timezone.utc).timestamp()
+        self._valid_after[user_id] = epoch
+        if self._users_high_water is None or valid_after > self._users_high_water:
+            self._users_high_water = valid_after
+
+    def is_user_revoked(self, user_id: str, issued_at: float) -> bool:
+        valid_after = self._valid_after.get(user_id)
+        return valid_after is not None and issued_at < valid_after
+
+    @staticmethod
+    def _token_lifetime() -> timedelta:
+        """Longest lifetime of any token we issue"""
+        return max(
+            timedelta(minutes=settings.access_token_expire_minutes),
+            timedelta(days=settings.refresh_token_expire_days),
+        )
+
+    async def load(self) -> None:
+        """Load every user epoch that can still reject a token"""
+        self._valid_after.clear()
+        self._users_high_water = None
+
+        now = datetime.utcnow()
+        await self._fetch_users(
+            {"tokens_valid_after": {"$gt": now - self._token_lifetime()}}
+        )
+        self.loaded = True
+        logger.debug(f"Revocation filter loaded ({len(self._valid_after)} users)")
+
+    async def sync(self) -> None:
+        """Pull user revocations recorded since the last sync"""
+        now = datetime.utcnow()
+        if self._users_high_water is None:
+            since = now - self._token_lifetime()
+        else:
+            since = self._users_high_water - self.overlap
+        await self._fetch_users({"tokens_valid_after": {"$gte": since}})
+
+        self._prune()
+        self.syncs += 1
+
+    async def _fetch_users(self, query: dict) -> None:
+        db = get_database()
+        cursor = db.users.find(query, {"_id": 1, "tokens_valid_after": 1})
+        async for doc in cursor:
+            self.revoke_user(str(doc["_id"]), doc["tokens_valid_after"])
+
+    def _prune(self) -> None:
+        now = datetime.utcnow()
+        # Every token issued before this point has expired on its own
+        horizon = (
+            now.replace(tzinfo=timezone.utc) - self._token_lifetime()
+        ).timestamp()
+        stale = [uid for uid, ts in self._valid_after.items() if ts <= horizon]
+        for uid in stale:
+            del self._valid_after[uid]
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.sync_interval)
+            try:
+                await self.sync()
+            except Exception as e:
+                logger.error(f"⚠️  Revocation sync failed: {e}")
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        self.loaded = False
+
+    def stats(self) -> dict:
+        return {
+            "loaded": self.loaded,
+            "users": len(self._valid_after),
+            "syncs": self.syncs,
+            "users_high_water": self._users_high_water,
+        }
+
+
+revocation_filter = RevocationFilter(
+    sync_interval=settings.revocation_sync_interval_seconds,
+)
@@ -6,5 +6,12 @@ class LoginRequest(BaseModel):
     password: str = "Example@123"
 
 
+class RefreshRequest(BaseModel):
+    refresh_token: str
+
+
 class TokenResponse(BaseModel):
     access_token: str
+    refresh_token: str
+    token_type: str = "bearer"
+    expires_in: int  # access token lifetime in seconds
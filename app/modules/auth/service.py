@@ -1,61 +1,132 @@
-from datetime import datetime
+from datetime import datetime, timezone
 
+from bson import ObjectId
+
+from app.core.config import settings
 from app.core.security import (
-    verify_password,
+    ACCESS_TOKEN,
+    REFRESH_TOKEN,
+    verify_password_async,
     create_access_token,
+    create_refresh_token,
     decode_access_token,
 )
 from app.core.database import get_database
 from app.modules.auth.repository import AuthRepository
+from app.modules.auth.schema import TokenResponse
+from app.modules.users.repository import UserRepository
 
 
 class AuthService:
 
-    async def login(self, username: str, password: str) -> str:
+    def _issue_tokens(self, user: dict) -> TokenResponse:
+        """Issue an access/refresh pair carrying the user's current claims"""
+        claims = {
+            "subject": user["username"],
+            "user_id": str(user["_id"]),
+            "is_admin": user.get("is_admin", False),
+        }
+        access_token, _, _ = create_access_token(**claims)
+        refresh_token, _, _ = create_refresh_token(**claims)
+
+        return TokenResponse(
+            access_token=access_token,
+            refresh_token=refresh_token,
+            expires_in=settings.access_token_expire_minutes * 60,
+        )
+
+    def _decode_refresh_token(self, token: str) -> dict:
+        payload = decode_access_token(token)
+        if payload.get("typ") != REFRESH_TOKEN:
+            raise ValueError("Not a refresh token")
+        if not payload.get("jti") or not payload.get("uid"):
+            raise ValueError("Invalid token format")
+        return payload
+
+    async def login(self, username: str, password: str) -> TokenResponse:
         db = get_database()
 
         # Query admin user จาก database
         user = await db.users.find_one({"username": username})
 
-        if not user:
+        if not user or user.get("status", "active") != "active":
             raise ValueError("Invalid credentials")
 
-        if not verify_password(password, user["password_hash"]):
+        if not await verify_password_async(password, user["password_hash"]):
             raise ValueError("Invalid credentials")
 
-        token, jti, expires_at = create_access_token(subject=username)
-        return token
+        return self._issue_tokens(user)
 
-    async def logout(self, token: str) -> None:
-        """Blacklist token on logout"""
+    async def refresh(self, refresh_token: str) -> TokenResponse:
+        """
+        Rotate a refresh token: revoke it and issue a new pair
+        - A refresh token that was already revoked (reuse) revokes every
+          token of its owner
+        """
         try:
-            # Decode JWE token
-            payload = decode_access_token(token)
+            payload = self._decode_refresh_token(refresh_token)
+            user_id = ObjectId(payload["uid"])
 
-            jti = payload.get("jti")
-            exp = payload.get("exp")
-            username = payload.get("sub")
+            # Fresh claims and status straight from the users collection
+            db = get_database()
+            user = await db.users.find_one({"_id": user_id})
+            if not user or user.get("status", "active") != "active":
+                raise ValueError("User not found")
 
-            if not jti:
-                raise ValueError("Invalid token format")
+            valid_after = user.get("tokens_valid_after")
+            if valid_after and payload.get("iat", 0) < valid_after.replace(
+                tzinfo=timezone.utc
+            ).timestamp():
+                raise ValueError("Token has been revoked")
 
-            # Get user info
-            db = get_database()
-            user = await db.users.find_one({"username": username})
+            # Atomic on the unique jti index: only one caller can rotate
+            rotated = await AuthRepository.blacklist_token(
+                jti=payload["jti"],
+                token=refresh_token,
+                expires_at=datetime.utcfromtimestamp(payload["exp"]),
+                user_id=user_id,
+            )
+            if not rotated:
+                await UserRepository().revoke_tokens(payload["uid"])
+                raise ValueError("Token has been revoked")
 
-            if not user:
-                raise ValueError("User not found")
+            return self._issue_tokens(user)
+
+        except ValueError:
+            raise
+        except Exception as e:
+            raise ValueError(f"Invalid token: {str(e)}")
+
+    async def logout(self, refresh_token: str) -> None:
+        """
+        Blacklist the refresh token on logout
+        The short-lived access token simply runs out
+        """
+        try:
+            payload = self._decode_refresh_token(refresh_token)
 
             # Blacklist token
-            expires_at = datetime.utcfromtimestamp(exp)
+            expires_at = datetime.utcfromtimestamp(payload["exp"])
             await AuthRepository.blacklist_token(
-                jti=jti,
-                token=token,
+                jti=payload["jti"],
+                token=refresh_token,
                 expires_at=expires_at,
-                user_id=user["_id"]
+                user_id=ObjectId(payload["uid"]),
             )
 
         except ValueError:
             raise
         except Exception as e:
             raise ValueError(f"Invalid token: {str(e)}")
+
+    async def logout_all(self, token: str) -> None:
+        """Revoke every token of the token's owner with one write"""
+        payload = decode_access_token(token)
+        if payload.get("typ") != ACCESS_TOKEN:
+            raise ValueError("Not an access token")
+        user_id = payload.get("uid")
+        if not user_id:
+            raise ValueError("Invalid token format")
+
+        if not await UserRepository().revoke_tokens(user_id):
+            raise ValueError("User not found")
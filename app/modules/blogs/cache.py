@@ -0,0 +1,197 @@
+"""
+Caches for blog reads: single lookups (by id and by slug) and list pages.
+
+Entries live in one memory-bounded TTLCache:
+
+- ("id", blog_id)  -> BlogModel, or NOT_FOUND for a remembered 404
+- ("slug", slug)   -> blog_id pointer, or NOT_FOUND
+
+A slug hit is only valid while the id entry it points to still carries
+that slug, so dropping the id entry on update/delete also retires every
+slug the blog was reachable under, including the one before a rename.
+
+Each worker has its own cache. Lookups first pass the blogs generation
+(see below) to ``observe``: once it moves past the value the cache was
+filled under, a write came from another worker and every entry is
+dropped. This worker's own writes only drop the entries they touch.
+
+Fills carry the write counter read before the query: a fill that raced
+an invalidation is dropped instead of caching the pre-write document.
+
+List pages are keyed by the blogs generation, a counter in the ``meta``
+collection bumped by every write, so all workers drop their pages as
+soon as they see the new value.
+"""
+
+import time
+from typing import Any, Optional
+
+from app.core.config import settings
+from app.core.database import get_database
+from app.modules.blogs.model import BlogModel
+from app.utils.cache import TTLCache
+
+NOT_FOUND = object()
+
+
+class BlogCache:
+    def __init__(
+        self,
+        maxsize: int,
+        max_bytes: int,
+        ttl: float,
+        negative_ttl: float,
+    ):
+        self.negative_ttl = negative_ttl
+        self.writes = 0
+        self.generation = 0
+        self.hits = 0
+        self.misses = 0
+        # BlogModel.__sizeof__ counts its field values
+        self._cache = TTLCache(maxsize=maxsize, ttl=ttl, max_bytes=max_bytes)
+
+    # ----------------------
+    # Lookup
+    # ----------------------
+    def observe(self, generation: int, local: bool = False) -> None:
+        """
+        Drop every entry if the blogs generation moved past the one the
+        cache holds; local: the step is a write of this worker, already
+        invalidated entry by entry
+        """
+        if generation <= self.generation:
+            return
+        if not (local and generation == self.generation + 1):
+            self.clear()
+        self.generation = generation
+
+    def get_by_id(self, blog_id: str) -> Any:
+        """Returns: BlogModel, NOT_FOUND, or None when not cached"""
+        return self._count(self._cache.get(("id", blog_id)))
+
+    def get_by_slug(self, slug: str) -> Any:
+        """Returns: BlogModel, NOT_FOUND, or None when not cached"""
+        pointer = self._cache.get(("slug", slug))
+        if pointer is None or pointer is NOT_FOUND:
+            return self._count(pointer)
+
+        blog = self._cache.get(("id", pointer))
+        if isinstance(blog, BlogModel) and blog.slug == slug:
+            return self._count(blog)
+        # The blog was renamed, deleted or evicted since
+        self._cache.pop(("slug", slug))
+        return self._count(None)
+
+    def _count(self, value: Any) -> Any:
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return value
+
+    # ----------------------
+    # Fill
+    # ----------------------
+    def put(self, blog: BlogModel, writes: int) -> None:
+        """writes: ``self.writes`` as read before the blog was queried"""
+        if writes != self.writes:
+            return
+        blog_id = str(blog.id)
+        self._cache.set(("id", blog_id), blog)
+        self._cache.set(("slug", blog.slug), blog_id)
+
+    def put_missing(
+        self,
+        writes: int,
+        blog_id: Optional[str] = None,
+        slug: Optional[str] = None,
+    ) -> None:
+        if writes != self.writes:
+            return
+        if blog_id is not None:
+            self._cache.set(("id", blog_id), NOT_FOUND, ttl=self.negative_ttl)
+        if slug is not None:
+            self._cache.set(("slug", slug), NOT_FOUND, ttl=self.negative_ttl)
+
+    # ----------------------
+    # Invalidate
+    # ----------------------
+    def invalidate(self, blog_id: str, *slugs: Optional[str]) -> None:
+        """Forget a blog and any (negative) entries for the given slugs"""
+        self.writes += 1
+        self._cache.pop(("id", blog_id))
+        for slug in slugs:
+            if slug:
+                self._cache.pop(("slug", slug))
+
+    def clear(self) -> None:
+        self.writes += 1
+        self._cache.clear()
+
+    def stats(self) -> dict:
+        # Hits/misses per lookup; a slug lookup touches two entries
+        lookups = self.hits + self.misses
+        return {
+            **self._cache.stats(),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+blog_cache = BlogCache(
+    maxsize=settings.blog_cache_size,
+    max_bytes=settings.blog_cache_max_bytes,
+    ttl=settings.blog_cache_ttl_seconds,
+    negative_ttl=settings.blog_cache_negative_ttl_seconds,
+)
+
+
+class BlogGeneration:
+    """Collection-wide version of the blogs, shared through MongoDB"""
+
+    def __init__(self, doc_id: str = "blogs"):
+        self.doc_id = doc_id
+        self.value = 0
+        self.checked_at = 0.0
+        self.reads = 0
+
+    async def current(self, max_age: float = 0) -> int:
+        """
+        Latest generation; with max_age the value last seen by this worker
+        is reused for up to max_age seconds (other workers' writes may be
+        missed for that long, this worker's never are)
+        """
+        if max_age > 0 and time.monotonic() - self.checked_at < max_age:
+            return self.value
+
+        doc = await get_database().meta.find_one({"_id": self.doc_id})
+        self.reads += 1
+        self._seen(doc["generation"] if doc else 0)
+        return self.value
+
+    async def bump(self) -> int:
+        doc = await get_database().meta.find_one_and_update(
+            {"_id": self.doc_id},
+            {"$inc": {"generation": 1}},
+            upsert=True,
+            return_document=True,
+        )
+        self._seen(doc["generation"])
+        return self.value
+
+    def _seen(self, value: int) -> None:
+        self.value = max(self.value, value)
+        self.checked_at = time.monotonic()
+
+    def stats(self) -> dict:
+        return {"value": self.value, "reads": self.reads}
+
+
+blog_generation = BlogGeneration()
+
+# (generation, normalized list params) -> (page, etag, last_modified)
+list_cache = TTLCache(
+    maxsize=settings.list_cache_size,
+    ttl=settings.list_cache_ttl_seconds,
+)
@@ -0,0 +1,376 @@
+"""
+sitemap.xml and RSS / Atom feeds of the published blogs.
+
+The sitemap is built from an in-memory index of every published blog
+(id -> pre-rendered <url> fragment). BlogService updates it on each
+write; writes made through other workers show up through the blogs
+generation and are caught up from MongoDB by created_at / updated_at,
+deletions from the blog_tombstones collection.
+Above ``sitemap_max_urls`` the sitemap becomes an index of numbered
+shards (in _id order), and a change only re-renders the shards it falls in.
+
+Feeds carry the newest ``feed_size`` posts, read with one indexed query
+when the cached feed was invalidated; item fragments are reused.
+
+Rendered documents are kept as bytes, plain and gzipped, until
+something they contain changes.
+"""
+
+import asyncio
+import bisect
+import gzip
+import hashlib
+from datetime import datetime, timedelta, timezone
+from typing import Literal, Optional
+from urllib.parse import quote
+from xml.sax.saxutils import escape, quoteattr
+
+from bson import ObjectId
+
+from app.core.config import settings
+from app.modules.blogs.cache import blog_generation
+from app.modules.blogs.model import BlogModel
+from app.modules.blogs.repository import BlogRepository
+from app.utils.http_cache import http_date, make_etag
+
+FeedFormat = Literal["rss", "atom"]
+
+# Other workers' timestamps come from their own clocks
+_SYNC_OVERLAP = timedelta(minutes=1)
+
+_XML_DECLARATION = b'<?xml version="1.0" encoding="UTF-8"?>\n'
+_EPOCH = datetime(1970, 1, 1)
+
+
+def post_url(slug: str) -> str:
+    path = settings.post_path_template.format(slug=quote(slug))
+    return settings.public_base_url.rstrip("/") + path
+
+
+def site_url(path: str = "/") -> str:
+    return settings.public_base_url.rstrip("/") + path
+
+
+def _w3c_date(value: datetime) -> str:
+    """ISO 8601 with offset, as sitemaps and Atom expect; naive = UTC"""
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc).isoformat(timespec="seconds")
+
+
+class RenderedDocument:
+    """One rendered XML document, ready to send"""
+
+    __slots__ = ("body", "gzipped", "etag", "gzip_etag", "last_modified")
+
+    def __init__(self, body: bytes, last_modified: Optional[datetime]):
+        self.body = body
+        self.gzipped = gzip.compress(body, compresslevel=6, mtime=0)
+        # From the content, so every worker serves the same ETag
+        self.etag = make_etag((hashlib.sha256(body).hexdigest(),))
+        self.gzip_etag = self.etag[:-1] + '-gzip"'
+        self.last_modified = last_modified
+
+
+class FeedIndex:
+    def __init__(self):
+        self._repo: BlogRepository | None = None
+        self._lock = asyncio.Lock()
+        self.loaded = False
+        self.generation = 0
+        self.synced_at = _EPOCH
+        # Published blogs: id -> (<url> fragment, lastmod), ids kept sorted
+        self._entries: dict[ObjectId, tuple[bytes, datetime]] = {}
+        self._order: list[ObjectId] = []
+        # ("sitemap", None | shard number) or ("feed", format) -> document
+        self._documents: dict[tuple, RenderedDocument] = {}
+        # (format, id, lastmod) -> item fragment of the current feed
+        self._items: dict[tuple, bytes] = {}
+        self.renders = 0
+
+    @property
+    def repo(self) -> BlogRepository:
+        if self._repo is None:
+            self._repo = BlogRepository()
+        return self._repo
+
+    # ----------------------
+    # Sync
+    # ----------------------
+    async def sync(self) -> None:
+        """Load the index, or catch up on writes seen via the generation"""
+        generation = await blog_generation.current(
+            max_age=settings.feed_sync_staleness_seconds
+        )
+        if self.loaded and generation <= self.generation:
+            return
+
+        async with self._lock:
+            if self.loaded and generation <= self.generation:
+                return
+            started = datetime.utcnow()
+            since = self.synced_at - _SYNC_OVERLAP
+            horizon = started - timedelta(seconds=settings.blog_tombstone_ttl_seconds)
+            # Tombstones older than the horizon have expired: reload
+            if not self.loaded or since < horizon:
+                await self._load()
+            else:
+                await self._catch_up(since)
+            self.generation = generation
+            self.synced_at = started
+
+    async def _load(self) -> None:
+        entries = {}
+        async for doc in self.repo.sitemap_cursor():
+            entries[doc["_id"]] = self._entry(doc["slug"], doc)
+        self._entries = entries
+        self._order = sorted(entries)
+        self._documents.clear()
+        self.loaded = True
+
+    async def _catch_up(self, since: datetime) -> None:
+        async for doc in self.repo.sitemap_cursor(since=since):
+            self._put(doc["_id"], doc["slug"], doc)
+        for blog_id in await self.repo.deleted_since(since):
+            self._drop(blog_id)
+
+    # ----------------------
+    # Hooks (BlogService)
+    # ----------------------
+    def apply(self, blog: BlogModel) -> None:
+        """A blog was created or updated through this worker"""
+        if self.loaded:
+            self._put(
+                blog.id,
+                blog.slug,
+                {
+                    "published": blog.published,
+                    "created_at": blog.created_at,
+                    "updated_at": blog.updated_at,
+                },
+            )
+            self._advance()
+
+    def remove(self, blog_id: str) -> None:
+        """A blog was deleted through this worker"""
+        if self.loaded and ObjectId.is_valid(blog_id):
+            self._drop(ObjectId(blog_id))
+            self._advance()
+
+    def _advance(self) -> None:
+        """
+        Count the generation this worker's write just bumped to as synced,
+        unless another worker's write came in between (that one still
+        needs a catch-up)
+        """
+        if blog_generation.value == self.generation + 1:
+            self.generation = blog_generation.value
+
+    # ----------------------
+    # Index maintenance
+    # ----------------------
+    @staticmethod
+    def _entry(slug: str, doc: dict) -> tuple[bytes, datetime]:
+        lastmod = doc.get("updated_at") or doc["created_at"]
+        fragment = (
+            f"<url><loc>{escape(post_url(slug))}</loc>"
+            f"<lastmod>{_w3c_date(lastmod)}</lastmod></url>\n"
+        )
+        return fragment.encode("utf-8"), lastmod
+
+    def _put(self, blog_id: ObjectId, slug: str, doc: dict) -> None:
+        if not doc.get("published"):
+            self._drop(blog_id)
+            return
+
+        position = bisect.bisect_left(self._order, blog_id)
+        added = blog_id not in self._entries
+        if added:
+            self._order.insert(position, blog_id)
+        self._entries[blog_id] = self._entry(slug, doc)
+        self._invalidate(position, shifted=added)
+
+    def _drop(self, blog_id: ObjectId) -> None:
+        if self._entries.pop(blog_id, None) is None:
+            return
+        position = bisect.bisect_left(self._order, blog_id)
+        del self._order[position]
+        self._invalidate(position, shifted=True)
+
+    def _invalidate(self, position: int, shifted: bool) -> None:
+        """
+        Forget documents showing the entry at position: the feeds, the
+        sitemap root and its shard (every later shard too when entries
+        moved up or down)
+        """
+        shard = position // settings.sitemap_max_urls + 1
+        for key in list(self._documents):
+            kind, part = key
+            if kind == "sitemap" and part is not None:
+                if part < shard or (part > shard and not shifted):
+                    continue
+            del self._documents[key]
+
+    # ----------------------
+    # Documents
+    # ----------------------
+    async def sitemap(self, shard: Optional[int] = None) -> Optional[RenderedDocument]:
+        """
+        The sitemap (an index of shards above sitemap_max_urls), or one
+        shard; None for a shard that does not exist
+        """
+        await self.sync()
+        key = ("sitemap", shard)
+        document = self._documents.get(key)
+        if document is None:
+            document = self._render_sitemap(shard)
+            if document is not None:
+                self._documents[key] = document
+        return document
+
+    async def feed(self, feed_format: FeedFormat = "rss") -> RenderedDocument:
+        await self.sync()
+        key = ("feed", feed_format)
+        document = self._documents.get(key)
+        if document is None:
+            docs = await self.repo.latest_published(settings.feed_size)
+            document = self._render_feed(feed_format, docs)
+            self._documents[key] = document
+        return document
+
+    def _render_sitemap(self, shard: Optional[int]) -> Optional[RenderedDocument]:
+        size = settings.sitemap_max_urls
+        shards = max(1, -(-len(self._order) // size))
+        if shard is not None and not (shards > 1 and 1 <= shard <= shards):
+            return None
+        self.renders += 1
+
+        if shard is None and shards > 1:
+            parts = [
+                b'<sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n'
+            ]
+            newest = None
+            for number in range(1, shards + 1):
+                ids = self._order[(number - 1) * size : number * size]
+                lastmod = max(self._entries[i][1] for i in ids)
+                newest = max(newest or lastmod, lastmod)
+                loc = escape(site_url(f"/sitemap-{number}.xml"))
+                entry = (
+                    f"<sitemap><loc>{loc}</loc>"
+                    f"<lastmod>{_w3c_date(lastmod)}</lastmod></sitemap>\n"
+                )
+                parts.append(entry.encode("utf-8"))
+            parts.append(b"</sitemapindex>\n")
+            return RenderedDocument(_XML_DECLARATION + b"".join(parts), newest)
+
+        ids = (
+            self._order
+            if shard is None
+            else self._order[(shard - 1) * size : shard * size]
+        )
+        entries = [self._entries[i] for i in ids]
+        body = b"".join(
+            (
+                _XML_DECLARATION,
+                b'<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n',
+                *(fragment for fragment, _ in entries),
+                b"</urlset>\n",
+            )
+        )
+        return RenderedDocument(body, max((m for _, m in entries), default=None))
+
+    def _render_feed(
+        self, feed_format: FeedFormat, docs: list[dict]
+    ) -> RenderedDocument:
+        self.renders += 1
+        items = {}
+        for doc in docs:
+            lastmod = doc.get("updated_at") or doc["created_at"]
+            key = (feed_format, doc["_id"], lastmod)
+            items[key] = self._items.get(key) or self._render_item(feed_format, doc)
+        # Keep the fragments of the other format; drop this one's stale items
+        self._items = {
+            **{k: v for k, v in self._items.items() if k[0] != feed_format},
+            **items,
+        }
+
+        updated = max((key[2] for key in items), default=None)
+        title = escape(settings.site_title)
+        description = escape(settings.site_description)
+        if feed_format == "atom":
+            head = (
+                '<feed xmlns="http://www.w3.org/2005/Atom">\n'
+                f"<title>{title}</title>\n"
+                + (f"<subtitle>{description}</subtitle>\n" if description else "")
+                + f"<id>{escape(site_url())}</id>\n"
+                f"<link href={quoteattr(site_url())}/>\n"
+                '<link rel="self" '
+                f"href={quoteattr(site_url('/feed.xml?format=atom'))}/>\n"
+                f"<updated>{_w3c_date(updated or _EPOCH)}</updated>\n"
+                f"<author><name>{title}</name></author>\n"
+            )
+            tail = "</feed>\n"
+        else:
+            head = (
+                '<rss version="2.0" xmlns:atom="http://www.w3.org/2005/Atom">\n'
+                "<channel>\n"
+                f"<title>{title}</title>\n"
+                f"<link>{escape(site_url())}</link>\n"
+                f"<description>{description}</description>\n"
+                f"<atom:link href={quoteattr(site_url('/feed.xml'))} "
+                'rel="self" type="application/rss+xml"/>\n'
+                + (
+                    f"<lastBuildDate>{http_date(updated)}</lastBuildDate>\n"
+                    if updated
+                    else ""
+                )
+            )
+            tail = "</channel>\n</rss>\n"
+
+        body = b"".join(
+            (
+                _XML_DECLARATION,
+                head.encode("utf-8"),
+                *items.values(),
+                tail.encode("utf-8"),
+            )
+        )
+        return RenderedDocument(body, updated)
+
+    @staticmethod
+    def _render_item(feed_format: FeedFormat, doc: dict) -> bytes:
+        link = post_url(doc["slug"])
+        url = escape(link)
+        title = escape(doc.get("title") or "")
+        summary = escape(doc.get("summary") or "")
+        created = doc["created_at"]
+        if feed_format == "atom":
+            item = (
+                f"<entry><title>{title}</title><id>{url}</id>"
+                f"<link href={quoteattr(link)}/>"
+                f"<published>{_w3c_date(created)}</published>"
+                f"<updated>{_w3c_date(doc.get('updated_at') or created)}</updated>"
+                + (f"<summary>{summary}</summary>" if summary else "")
+                + "</entry>\n"
+            )
+        else:
+            item = (
+                f"<item><title>{title}</title><link>{url}</link>"
+                f'<guid isPermaLink="true">{url}</guid>'
+                f"<pubDate>{http_date(created)}</pubDate>"
+                + (f"<description>{summary}</description>" if summary else "")
+                + "</item>\n"
+            )
+        return item.encode("utf-8")
+
+    def stats(self) -> dict:
+        return {
+            "loaded": self.loaded,
+            "published": len(self._entries),
+            "generation": self.generation,
+            "cached_documents": len(self._documents),
+            "renders": self.renders,
+        }
+
+
+feed_index = FeedIndex()
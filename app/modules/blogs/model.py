@@ -1,3 +1,4 @@
+import sys
 from datetime import datetime
 from typing import Optional, List
 
@@ -7,8 +8,16 @@ from bson import ObjectId
 class BlogModel:
     """
     MongoDB document model
+
+    Slotted: no per-instance __dict__, so cached blogs and list pages hold
+    less memory per post.
     """
 
+    __slots__ = (
+        "id", "title", "slug", "summary", "content", "cover_image",
+        "tags", "published", "created_at", "updated_at",
+    )
+
     def __init__(
         self,
         title: str,
@@ -33,6 +42,18 @@ class BlogModel:
         self.created_at = created_at or datetime.utcnow()
         self.updated_at = updated_at
 
+    def __sizeof__(self) -> int:
+        """The instance plus its field values (for the cache's byte budget)"""
+        size = object.__sizeof__(self)
+        for slot in BlogModel.__slots__:
+            value = getattr(self, slot)
+            if value is None:
+                continue
+            size += sys.getsizeof(value)
+            if isinstance(value, list):
+                size += sum(sys.getsizeof(item) for item in value)
+        return size
+
     def to_dict(self) -> dict:
         return {
             "_id": self.id,
@@ -56,6 +77,7 @@ class BlogModel:
             summary=data.get("summary"),
             content=data.get("content"),
             cover_image=data.get("cover_image"),
+            tags=data.get("tags"),
             published=data.get("published", False),
             created_at=data.get("created_at"),
             updated_at=data.get("updated_at"),
@@ -0,0 +1,71 @@
+"""
+Character n-gram search for title and summary.
+
+Thai (and other unsegmented scripts) has no spaces between words, so
+word-based text indexes cannot find a word inside a title. Instead every
+blog stores the distinct character trigrams of its title and summary in
+multikey-indexed arrays, plus the normalized text itself. A substring
+query is then answered by an index lookup on its own trigrams, and only
+those candidates are confirmed with a ``$regex`` over the normalized
+text, so both steps see the same case-, width- and space-folded form.
+"""
+
+import re
+import unicodedata
+from typing import Optional
+
+NGRAM_SIZE = 3
+
+# Document field holding the grams for each searchable field
+GRAM_FIELDS = {
+    "title": "title_grams",
+    "summary": "summary_grams",
+}
+
+# Document field holding the normalized text the $regex confirms against
+NORMALIZED_FIELDS = {
+    "title": "title_normalized",
+    "summary": "summary_normalized",
+}
+
+
+def normalize(text: str) -> str:
+    """Case- and width-insensitive form used for both indexing and queries"""
+    text = unicodedata.normalize("NFKC", text).casefold()
+    return " ".join(text.split())
+
+
+def ngrams(text: Optional[str], n: int = NGRAM_SIZE) -> list[str]:
+    """Distinct character n-grams of the normalized text"""
+    if not text:
+        return []
+    text = normalize(text)
+    if len(text) < n:
+        return [text]
+    return sorted({text[i : i + n] for i in range(len(text) - n + 1)})
+
+
+def search_fields(data: dict) -> dict:
+    """
+    Search fields to store alongside the given title/summary values
+    e.g. {"title": "..."} -> {"title_grams": [...], "title_normalized": "..."}
+    """
+    fields: dict = {}
+    for field in GRAM_FIELDS:
+        if field in data:
+            fields[GRAM_FIELDS[field]] = ngrams(data[field])
+            fields[NORMALIZED_FIELDS[field]] = normalize(data[field] or "")
+    return fields
+
+
+def substring_filter(field: str, q: str) -> dict:
+    """
+    Condition matching documents whose ``field`` contains q, compared in
+    normalized form. Queries shorter than one n-gram cannot use the
+    index and fall back to the regex alone.
+    """
+    q = normalize(q)
+    condition: dict = {NORMALIZED_FIELDS[field]: {"$regex": re.escape(q)}}
+    if len(q) >= NGRAM_SIZE:
+        condition[GRAM_FIELDS[field]] = {"$all": ngrams(q)}
+    return condition
@@ -0,0 +1,98 @@
+"""
+Keyset (cursor) pagination helpers for blog listings.
+
+A cursor encodes the sort option plus the sort-key value and ``_id`` of
+the last item on a page. The next page is then a range condition on
+(sort key, _id) instead of a skip over every earlier document.
+"""
+
+import base64
+from typing import Any, Optional
+
+from bson import ObjectId, json_util
+
+# sort_by option -> (field, direction); _id breaks ties in the same direction
+SORT_OPTIONS = {
+    "created_date_asc": ("created_at", 1),
+    "created_date_desc": ("created_at", -1),
+    "updated_date_asc": ("updated_at", 1),
+    "updated_date_desc": ("updated_at", -1),
+    "title_asc": ("title", 1),
+    "title_desc": ("title", -1),
+}
+DEFAULT_SORT = "created_date_desc"
+
+# Locale-aware A-Z for title sorts (Thai and Latin titles together).
+# The title indexes are built with the same collation; a query can only
+# use them when it passes an identical collation.
+TITLE_COLLATION = {"locale": "th"}
+
+
+def resolve_sort(sort_by: str) -> tuple[str, str, int]:
+    """
+    Returns: (normalized sort_by, field, direction)
+    Unknown sort_by values fall back to newest first
+    """
+    if sort_by not in SORT_OPTIONS:
+        sort_by = DEFAULT_SORT
+    key, order = SORT_OPTIONS[sort_by]
+    return sort_by, key, order
+
+
+def sort_spec(key: str, order: int) -> list[tuple[str, int]]:
+    return [(key, order), ("_id", order)]
+
+
+def sort_collation(key: str) -> Optional[dict]:
+    """Collation a query sorted by ``key`` must run with (None = binary)"""
+    return TITLE_COLLATION if key == "title" else None
+
+
+def encode_cursor(sort_by: str, value: Any, _id: ObjectId) -> str:
+    raw = json_util.dumps({"s": sort_by, "v": value, "id": _id})
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str, sort_by: str) -> tuple[Any, ObjectId]:
+    """
+    Returns: (last sort-key value, last _id)
+    Raises: ValueError if the cursor is malformed or from another sort order
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        data = json_util.loads(base64.urlsafe_b64decode(padded).decode("utf-8"))
+        value, _id = data["v"], data["id"]
+        if not isinstance(_id, ObjectId):
+            raise TypeError("bad _id")
+    except Exception:
+        raise ValueError("Invalid cursor")
+
+    if data.get("s") != sort_by:
+        raise ValueError("Cursor does not match sort_by")
+
+    return value, _id
+
+
+def keyset_filter(key: str, order: int, value: Any, _id: ObjectId) -> dict:
+    """
+    Condition selecting everything strictly after (value, _id) in sort order.
+    Missing/null values sort before any other value in MongoDB, which
+    needs separate branches since $gt/$lt never match null.
+    """
+    after = "$gt" if order == 1 else "$lt"
+    same_value_after = {key: value, "_id": {after: _id}}
+
+    if value is None:
+        if order == 1:
+            return {"$or": [same_value_after, {key: {"$ne": None}}]}
+        return same_value_after
+
+    branches = [{key: {after: value}}, same_value_after]
+    if order == -1:
+        branches.append({key: None})
+    return {"$or": branches}
+
+
+def next_cursor(sort_by: str, key: str, last: Any) -> Optional[str]:
+    """Cursor pointing after ``last`` (a BlogModel)"""
+    return encode_cursor(sort_by, getattr(last, key), last.id)
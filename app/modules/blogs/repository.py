@@ -1,17 +1,61 @@
+import re
 from datetime import datetime
-from typing import List, Optional
+from typing import Any, Iterable, List, Optional
 
 from bson import ObjectId
-from pymongo.errors import DuplicateKeyError
+from motor.motor_asyncio import AsyncIOMotorCursor
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError, DuplicateKeyError
 
-from app.core.database import get_database
+from app.core.config import settings
+from app.core.database import (
+    WithTotal,
+    find_page,
+    get_database,
+    verify_query_plans,
+)
+from app.modules.blogs import ngram
+from app.modules.blogs.cache import NOT_FOUND, blog_cache, blog_generation
 from app.modules.blogs.model import BlogModel
+from app.modules.blogs.pagination import (
+    SORT_OPTIONS,
+    TITLE_COLLATION,
+    decode_cursor,
+    keyset_filter,
+    next_cursor,
+    resolve_sort,
+    sort_collation,
+    sort_spec,
+)
+from app.modules.blogs.schema import BlogListItem, BlogResponse
+
+# Everything a listing needs; content stays in MongoDB
+LIST_PROJECTION = {f: 1 for f in BlogListItem.model_fields if f != "id"}
+
+# A full blog as the API returns it (no search fields)
+EXPORT_PROJECTION = {f: 1 for f in BlogResponse.model_fields if f != "id"}
+
+# What the sitemap and the feeds show of a blog
+SITEMAP_PROJECTION = {"slug": 1, "published": 1, "created_at": 1, "updated_at": 1}
+FEED_PROJECTION = {**SITEMAP_PROJECTION, "title": 1, "summary": 1}
+
+DUPLICATE_KEY = 11000
+
+
+class SlugConflictError(ValueError):
+    """Another blog took the slug between allocation and write"""
+
+    def __init__(self, slug: str):
+        super().__init__("Slug already exists")
+        self.slug = slug
 
 
 class BlogRepository:
     def __init__(self):
         self.db = get_database()
         self.collection = self.db["blogs"]
+        # Ids of deleted blogs, for other workers' sitemap catch-up
+        self.tombstones = self.db["blog_tombstones"]
 
     # ----------------------
     # Index
@@ -21,46 +65,322 @@ class BlogRepository:
         Call once on startup
         """
         await self.collection.create_index("slug", unique=True)
-        await self.collection.create_index("created_at")
+
+        # One index per list() shape: (filter, sort key, _id) so the page
+        # comes back in index order with no in-memory SORT. Ascending keys
+        # serve both directions; published + tags together use either one.
+        for key in ("created_at", "updated_at", "title"):
+            options = {"collation": TITLE_COLLATION} if key == "title" else {}
+            for prefix in ([], ["published"], ["tags"]):
+                await self.collection.create_index(
+                    [(field, 1) for field in (*prefix, key, "_id")],
+                    **options,
+                )
+
+        # Full-text search, weighted title > tags > summary > content.
+        # No language stemming: much of the content is Thai.
+        await self.collection.create_index(
+            [
+                ("title", "text"),
+                ("tags", "text"),
+                ("summary", "text"),
+                ("content", "text"),
+            ],
+            name="blog_text_search",
+            weights={"title": 10, "tags": 5, "summary": 3, "content": 1},
+            default_language="none",
+        )
+
+        # Character trigram postings for substring search (see ngram.py)
+        for gram_field in ngram.GRAM_FIELDS.values():
+            await self.collection.create_index(gram_field)
+
+        # Tombstones are read by deleted_at and expire on it
+        await self.tombstones.create_index(
+            "deleted_at",
+            expireAfterSeconds=settings.blog_tombstone_ttl_seconds,
+        )
+
+    async def verify_indexes(self) -> dict[str, list[str]]:
+        """Warn if any list() sort option needs a COLLSCAN or in-memory SORT"""
+        filters = {
+            "": {},
+            "published": {"published": True},
+            "tags": {"tags": {"$in": [""]}},
+        }
+        shapes = {}
+        for sort_by, (key, order) in SORT_OPTIONS.items():
+            for name, query in filters.items():
+                cursor = self.collection.find(query).sort(sort_spec(key, order))
+                collation = sort_collation(key)
+                if collation:
+                    cursor = cursor.collation(collation)
+                shape = f"list[{sort_by}{', ' + name if name else ''}]"
+                shapes[shape] = cursor.limit(21)
+        return await verify_query_plans(
+            "blogs", shapes, forbidden=("COLLSCAN", "SORT")
+        )
+
+    async def backfill_search_grams(self, batch_size: int = 500) -> int:
+        """
+        Add search fields (n-grams, normalized text) to blogs written
+        before they existed
+        Returns: number of blogs updated
+        """
+        cursor = self.collection.find(
+            {ngram.NORMALIZED_FIELDS["title"]: {"$exists": False}},
+            {"title": 1, "summary": 1},
+        )
+        updated = 0
+        batch: list[UpdateOne] = []
+        async for doc in cursor:
+            fields = ngram.search_fields(
+                {"title": doc.get("title"), "summary": doc.get("summary")}
+            )
+            batch.append(UpdateOne({"_id": doc["_id"]}, {"$set": fields}))
+            if len(batch) >= batch_size:
+                await self.collection.bulk_write(batch, ordered=False)
+                updated += len(batch)
+                batch = []
+        if batch:
+            await self.collection.bulk_write(batch, ordered=False)
+            updated += len(batch)
+        return updated
 
     # ----------------------
     # Create
     # ----------------------
-    async def create(self, blog: BlogModel) -> BlogModel:
+    async def create(self, blog: BlogModel, extra: Optional[dict] = None) -> BlogModel:
+        """extra: additional stored fields, e.g. search fields"""
         try:
-            await self.collection.insert_one(blog.to_dict())
-            return blog
+            await self.collection.insert_one({**blog.to_dict(), **(extra or {})})
         except DuplicateKeyError:
-            raise ValueError("Slug already exists")
+            raise SlugConflictError(blog.slug)
+
+        # Drop remembered 404s for the new id / slug and every cached list
+        blog_cache.invalidate(str(blog.id), blog.slug)
+        blog_cache.observe(await blog_generation.bump(), local=True)
+        return blog
+
+    async def create_many(
+        self,
+        blogs: List[tuple[BlogModel, dict]],
+    ) -> dict[int, ValueError]:
+        """
+        Insert (blog, extra) pairs with one unordered insert_many
+        Returns: errors by position in ``blogs`` (SlugConflictError for a
+        taken slug); every other blog was inserted
+        """
+        if not blogs:
+            return {}
+
+        errors: dict[int, ValueError] = {}
+        try:
+            await self.collection.insert_many(
+                [{**blog.to_dict(), **extra} for blog, extra in blogs],
+                ordered=False,
+            )
+        except BulkWriteError as e:
+            for error in e.details.get("writeErrors", []):
+                index = error["index"]
+                if error.get("code") == DUPLICATE_KEY:
+                    errors[index] = SlugConflictError(blogs[index][0].slug)
+                else:
+                    errors[index] = ValueError(error.get("errmsg", "Write failed"))
+
+        for index, (blog, _) in enumerate(blogs):
+            if index not in errors:
+                blog_cache.invalidate(str(blog.id), blog.slug)
+        if len(errors) < len(blogs):
+            blog_cache.observe(await blog_generation.bump(), local=True)
+        return errors
+
+    # ----------------------
+    # Slug allocation
+    # ----------------------
+    async def allocate_slug(self, base: str, blog_id: Optional[str] = None) -> str:
+        """
+        Smallest free slug among base, base-1, base-2, ... in one query
+        - The anchored prefix regex is an index range scan on slug
+        - blog_id keeps a blog's current slug if it is already in the family
+        Not reserved: the unique index still decides, see SlugConflictError
+        """
+        pattern = f"^{re.escape(base)}(?:-([0-9]+))?$"
+        cursor = self.collection.find(
+            {"slug": {"$regex": pattern}},
+            {"slug": 1},
+        )
+
+        taken: set[int] = set()
+        async for doc in cursor:
+            if blog_id and str(doc["_id"]) == blog_id:
+                return doc["slug"]
+            match = re.match(pattern, doc["slug"])
+            if match:
+                taken.add(int(match.group(1) or 0))
+
+        return self.claim_slug(base, taken)
+
+    @staticmethod
+    def claim_slug(base: str, taken: set[int]) -> str:
+        """Smallest free slug for base; marks its suffix taken"""
+        counter = 0
+        while counter in taken:
+            counter += 1
+        taken.add(counter)
+        return base if counter == 0 else f"{base}-{counter}"
+
+    async def taken_slug_suffixes(self, bases: Iterable[str]) -> dict[str, set[int]]:
+        """
+        Suffixes already in use for many base slugs in one query
+        (0 = the bare base), e.g. {"hello": {0, 2}} for hello, hello-2
+        """
+        taken: dict[str, set[int]] = {base: set() for base in bases}
+        if not taken:
+            return taken
+
+        patterns = [
+            re.compile(f"^{re.escape(base)}(?:-[0-9]+)?$") for base in taken
+        ]
+        cursor = self.collection.find(
+            {"slug": {"$in": patterns}},
+            {"_id": 0, "slug": 1},
+        )
+        async for doc in cursor:
+            slug = doc["slug"]
+            # "a-b-2" is suffix 2 of "a-b" and also the bare "a-b-2"
+            if slug in taken:
+                taken[slug].add(0)
+            head, _, tail = slug.rpartition("-")
+            if tail.isascii() and tail.isdigit() and head in taken:
+                taken[head].add(int(tail))
+        return taken
 
     # ----------------------
     # Get by ID
     # ----------------------
-    async def get_by_id(self, blog_id: str) -> Optional[BlogModel]:
+    async def get_by_id(
+        self,
+        blog_id: str,
+        max_staleness: float = 0,
+    ) -> Optional[BlogModel]:
+        """
+        Read-through blog_cache; cached models are shared, do not mutate
+        max_staleness: seconds the blogs generation seen by this worker may
+        be reused before other workers' writes must show
+        """
         try:
             _id = ObjectId(blog_id)
         except Exception:
             return None
 
+        blog_cache.observe(await blog_generation.current(max_age=max_staleness))
+        cached = blog_cache.get_by_id(str(_id))
+        if cached is not None:
+            return None if cached is NOT_FOUND else cached
+
+        writes = blog_cache.writes
         doc = await self.collection.find_one({"_id": _id})
         if not doc:
+            blog_cache.put_missing(writes, blog_id=str(_id))
             return None
 
-        return BlogModel.from_mongo(doc)
+        blog = BlogModel.from_mongo(doc)
+        blog_cache.put(blog, writes)
+        return blog
 
     # ----------------------
     # Get by Slug (SEO)
     # ----------------------
-    async def get_by_slug(self, slug: str) -> Optional[BlogModel]:
+    async def get_by_slug(
+        self,
+        slug: str,
+        max_staleness: float = 0,
+    ) -> Optional[BlogModel]:
+        """Read-through blog_cache, as get_by_id"""
+        blog_cache.observe(await blog_generation.current(max_age=max_staleness))
+        cached = blog_cache.get_by_slug(slug)
+        if cached is not None:
+            return None if cached is NOT_FOUND else cached
+
+        writes = blog_cache.writes
         doc = await self.collection.find_one({"slug": slug})
         if not doc:
+            blog_cache.put_missing(writes, slug=slug)
             return None
 
-        return BlogModel.from_mongo(doc)
+        blog = BlogModel.from_mongo(doc)
+        blog_cache.put(blog, writes)
+        return blog
+
+    # ----------------------
+    # Version (HTTP validators)
+    # ----------------------
+    async def get_version(
+        self,
+        blog_id: Optional[str] = None,
+        slug: Optional[str] = None,
+        max_staleness: float = 0,
+    ) -> Optional[dict]:
+        """
+        Only _id, created_at and updated_at of a blog (never the content),
+        answered from blog_cache when the blog is cached
+        Raises: ValueError if neither blog_id nor slug is given
+        """
+        blog_cache.observe(await blog_generation.current(max_age=max_staleness))
+        query: dict[str, Any]
+        if blog_id is not None:
+            try:
+                query = {"_id": ObjectId(blog_id)}
+            except Exception:
+                return None
+            cached = blog_cache.get_by_id(str(query["_id"]))
+        elif slug is not None:
+            query = {"slug": slug}
+            cached = blog_cache.get_by_slug(slug)
+        else:
+            raise ValueError("get_version needs a blog_id or a slug")
+
+        if cached is NOT_FOUND:
+            return None
+        if cached is not None:
+            return {
+                "_id": cached.id,
+                "created_at": cached.created_at,
+                "updated_at": cached.updated_at,
+            }
+
+        return await self.collection.find_one(
+            query, {"created_at": 1, "updated_at": 1}
+        )
 
     # ----------------------
     # List
     # ----------------------
+    @staticmethod
+    def build_query(
+        published: Optional[bool] = None,
+        title: str = "",
+        tags: str = "",
+    ) -> dict:
+        query: dict[str, Any] = {}
+
+        # Filter by published
+        if published is not None:
+            query["published"] = published
+
+        # Filter by title (case-insensitive substring, n-gram indexed)
+        if title:
+            query.update(ngram.substring_filter("title", title))
+
+        # Filter by tags (match any tag in the list)
+        if tags:
+            # Sorted so equal tag sets produce the same filter (count cache key)
+            tag_list = sorted({t.strip() for t in tags.split(",")})
+            query["tags"] = {"$in": tag_list}
+
+        return query
+
     async def list(
         self,
         published: Optional[bool] = None,
@@ -70,7 +390,10 @@ class BlogRepository:
         sort_by: str = "created_date_desc",
         limit: int = 20,
         skip: int = 0,
-    ) -> tuple[List[BlogModel], int]:
+        cursor: Optional[str] = None,
+        with_total: WithTotal = "exact",
+        fields: Optional[List[str]] = None,
+    ) -> tuple[List[BlogModel], Optional[int], Optional[str]]:
         """
         List blogs with filtering and sorting
 
@@ -81,50 +404,188 @@ class BlogRepository:
         - updated_date_desc: updated date หลัง (newest first)
         - title_asc: title ก-ฮ (A-Z)
         - title_desc: title ฮ-ก (Z-A)
+
+        Pass the returned next_cursor as ``cursor`` to fetch the next page
+        as an index range scan; ``skip`` is ignored when a cursor is given.
+
+        with_total: exact (counted with the page), estimated (cached count)
+        or none (total is None; next_cursor alone tells if more exist)
+
+        Only the listing fields (no content) are loaded unless ``fields``
+        names others; unloaded attributes are None on the returned models.
+        Returns: (blogs, total, next_cursor)
+        Raises: ValueError on an invalid cursor
         """
-        query = {}
+        query = self.build_query(published, title, tags)
 
-        # Filter by published
-        if published is not None:
-            query["published"] = published
+        # Default sort: newest first
+        sort_by, sort_key, sort_order = resolve_sort(sort_by)
 
-        # Filter by title (case-insensitive)
-        if title:
-            query["title"] = {"$regex": title, "$options": "i"}
+        after = None
+        if cursor:
+            last_value, last_id = decode_cursor(cursor, sort_by)
+            after = keyset_filter(sort_key, sort_order, last_value, last_id)
+            skip = 0
 
-        # Filter by tags (match any tag in the list)
-        if tags:
-            tag_list = [t.strip() for t in tags.split(",")]
-            query["tags"] = {"$in": tag_list}
+        projection = LIST_PROJECTION
+        if fields is not None:
+            # The sort key is always needed to build next_cursor and the
+            # timestamps to build the list ETag
+            projection = {
+                f: 1 for f in [*fields, sort_key, "created_at", "updated_at"]
+            }
 
-        # Get total count before pagination
-        total = await self.collection.count_documents(query)
-
-        # Sort mapping
-        sort_map = {
-            "created_date_asc": ("created_at", 1),
-            "created_date_desc": ("created_at", -1),
-            "updated_date_asc": ("updated_at", 1),
-            "updated_date_desc": ("updated_at", -1),
-            "title_asc": ("title", 1),
-            "title_desc": ("title", -1),
-        }
+        docs, total, has_more = await find_page(
+            self.collection,
+            query,
+            sort_spec(sort_key, sort_order),
+            limit=limit,
+            skip=skip,
+            after=after,
+            with_total=with_total,
+            projection=projection,
+            collation=sort_collation(sort_key),
+            large_items="content" in projection,
+        )
 
-        # Default sort: newest first
-        sort_key, sort_order = sort_map.get(sort_by, ("created_at", -1))
+        blogs: List[BlogModel] = [BlogModel.from_mongo(doc) for doc in docs]
 
+        next_page = None
+        if has_more:
+            next_page = next_cursor(sort_by, sort_key, blogs[-1])
+
+        return blogs, total, next_page
+
+    # ----------------------
+    # Export
+    # ----------------------
+    def export_cursor(
+        self,
+        published: Optional[bool] = None,
+        title: str = "",
+        tags: str = "",
+        after: Optional[str] = None,
+        batch_size: int = 1000,
+    ) -> AsyncIOMotorCursor:
+        """
+        Every matching blog in _id order, fetched batch_size at a time
+        after: resume after this blog id (exclusive)
+        Raises: ValueError on an invalid after id
+        """
+        query = self.build_query(published, title, tags)
+        if after:
+            try:
+                query["_id"] = {"$gt": ObjectId(after)}
+            except Exception:
+                raise ValueError("Invalid after id")
+
+        # Walk the _id index so results stream without an in-memory SORT,
+        # however selective the filters are
+        return (
+            self.collection.find(query, EXPORT_PROJECTION)
+            .sort("_id", 1)
+            .hint([("_id", 1)])
+            .batch_size(batch_size)
+        )
+
+    # ----------------------
+    # Sitemap / feeds
+    # ----------------------
+    def sitemap_cursor(self, since: Optional[datetime] = None) -> AsyncIOMotorCursor:
+        """
+        Every published blog, or with ``since`` every blog (published or
+        not) created or updated at or after it
+        """
+        query: dict[str, Any]
+        if since is None:
+            query = {"published": True}
+        else:
+            query = {
+                "$or": [
+                    {"created_at": {"$gte": since}},
+                    {"updated_at": {"$gte": since}},
+                ]
+            }
+        return self.collection.find(query, SITEMAP_PROJECTION).batch_size(5000)
+
+    async def deleted_since(self, since: datetime) -> List[ObjectId]:
+        """Ids of blogs deleted at or after ``since`` (see tombstones)"""
+        cursor = self.tombstones.find({"deleted_at": {"$gte": since}}, {"_id": 1})
+        return [doc["_id"] async for doc in cursor]
+
+    async def latest_published(self, limit: int) -> List[dict]:
+        """Newest published blogs, for the feeds"""
         cursor = (
-            self.collection.find(query)
-            .sort(sort_key, sort_order)
-            .skip(skip)
+            self.collection.find({"published": True}, FEED_PROJECTION)
+            .sort(sort_spec("created_at", -1))
             .limit(limit)
         )
+        return await cursor.to_list(length=limit)
 
-        blogs: List[BlogModel] = []
-        async for doc in cursor:
-            blogs.append(BlogModel.from_mongo(doc))
+    # ----------------------
+    # Search
+    # ----------------------
+    async def search(
+        self,
+        q: str,
+        published: Optional[bool] = None,
+        tags: str = "",
+        limit: int = 20,
+        skip: int = 0,
+        with_total: WithTotal = "exact",
+    ) -> tuple[List[tuple[BlogModel, float]], Optional[int], bool]:
+        """
+        Full-text search over title, tags, summary and content,
+        most relevant first (uses the blog_text_search index)
+        Returns: ([(blog, score)], total, has_more)
+        """
+        query = self.build_query(published=published, tags=tags)
+        query["$text"] = {"$search": q}
 
-        return blogs, total
+        score = {"$meta": "textScore"}
+        docs, total, has_more = await find_page(
+            self.collection,
+            query,
+            [("score", score), ("_id", -1)],
+            limit=limit,
+            skip=skip,
+            with_total=with_total,
+            projection={**LIST_PROJECTION, "score": score},
+        )
+
+        results = [(BlogModel.from_mongo(doc), doc["score"]) for doc in docs]
+        return results, total, has_more
+
+    async def search_substring(
+        self,
+        q: str,
+        published: Optional[bool] = None,
+        tags: str = "",
+        limit: int = 20,
+        skip: int = 0,
+        with_total: WithTotal = "exact",
+    ) -> tuple[List[BlogModel], Optional[int], bool]:
+        """
+        Substring search over title and summary, newest first
+        Works for unsegmented text such as Thai (uses the n-gram indexes)
+        Returns: (blogs, total, has_more)
+        """
+        query = self.build_query(published=published, tags=tags)
+        query["$or"] = [
+            ngram.substring_filter(field, q) for field in ngram.GRAM_FIELDS
+        ]
+
+        docs, total, has_more = await find_page(
+            self.collection,
+            query,
+            sort_spec("created_at", -1),
+            limit=limit,
+            skip=skip,
+            with_total=with_total,
+            projection=LIST_PROJECTION,
+        )
+
+        return [BlogModel.from_mongo(doc) for doc in docs], total, has_more
 
     # ----------------------
     # Update
@@ -141,11 +602,19 @@ class BlogRepository:
 
         data["updated_at"] = datetime.utcnow()
 
-        result = await self.collection.find_one_and_update(
-            {"_id": _id},
-            {"$set": data},
-            return_document=True,
-        )
+        try:
+            result = await self.collection.find_one_and_update(
+                {"_id": _id},
+                {"$set": data},
+                return_document=True,
+            )
+        except DuplicateKeyError:
+            raise SlugConflictError(data.get("slug", ""))
+
+        # The old slug retires with the id entry; the new one may be a cached 404
+        blog_cache.invalidate(str(_id), data.get("slug"))
+        if result:
+            blog_cache.observe(await blog_generation.bump(), local=True)
 
         if not result:
             return None
@@ -162,4 +631,13 @@ class BlogRepository:
             return False
 
         result = await self.collection.delete_one({"_id": _id})
+        blog_cache.invalidate(str(_id))
+        if result.deleted_count:
+            # Recorded before the bump that makes other workers look for it
+            await self.tombstones.update_one(
+                {"_id": _id},
+                {"$set": {"deleted_at": datetime.utcnow()}},
+                upsert=True,
+            )
+            blog_cache.observe(await blog_generation.bump(), local=True)
         return result.deleted_count == 1
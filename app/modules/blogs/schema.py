@@ -55,3 +55,53 @@ class BlogResponse(BaseModel):
 
     class Config:
         from_attributes = True
+
+
+class BlogListItem(BaseModel):
+    """Listing entry - everything but the content"""
+    id: str
+    title: str
+    slug: str
+    summary: Optional[str] = None
+    cover_image: Optional[str] = None
+    tags: List[str]
+    published: bool
+    created_at: datetime
+    updated_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
+
+
+class BlogSearchItem(BlogListItem):
+    """Search hit with its relevance score"""
+    score: Optional[float] = None  # None in substring mode
+
+
+class BlogListResponse(BaseModel):
+    """Response schema for a page of blogs (items hold only ?fields= if given)"""
+    total: Optional[int] = None  # None when listed with with_total=none
+    items: List[BlogListItem]
+    next_cursor: Optional[str] = None
+    has_more: bool = False
+
+
+class BlogSearchResponse(BaseModel):
+    """Response schema for a page of search hits"""
+    total: Optional[int] = None  # None when searched with with_total=none
+    items: List[BlogSearchItem]
+    has_more: bool = False
+
+
+# Fields a list request may pick with ?fields=
+BLOG_FIELDS = (
+    "title",
+    "slug",
+    "summary",
+    "content",
+    "cover_image",
+    "tags",
+    "published",
+    "created_at",
+    "updated_at",
+)
@@ -1,15 +1,33 @@
-from typing import List, Optional
+from datetime import datetime
+from typing import AsyncIterable, AsyncIterator, List, Optional
 
 from fastapi import HTTPException, status
+from pydantic import ValidationError
 from slugify import slugify  # python-slugify
 
 from app.modules.blogs.schema import (
+    BLOG_FIELDS,
     BlogCreate,
+    BlogListItem,
     BlogUpdate,
     BlogResponse,
 )
+from app.core.database import WithTotal
+from app.modules.blogs import ngram
+from app.modules.blogs.cache import blog_generation, list_cache
+from app.modules.blogs.feeds import feed_index
+from app.modules.blogs.pagination import resolve_sort
 from app.modules.blogs.model import BlogModel
-from app.modules.blogs.repository import BlogRepository
+from app.modules.blogs.repository import BlogRepository, SlugConflictError
+from app.utils import ndjson
+from app.utils.http_cache import make_etag
+
+# Re-allocations after losing a slug to a concurrent write
+SLUG_ALLOCATION_ATTEMPTS = 5
+
+# Output fields (after id) in schema order
+LIST_ITEM_FIELDS = tuple(f for f in BlogListItem.model_fields if f != "id")
+RESPONSE_FIELDS = tuple(f for f in BlogResponse.model_fields if f != "id")
 
 
 class BlogService:
@@ -26,54 +44,150 @@ class BlogService:
     # Create
     # ----------------------
 
-    async def create_blog(self, data: BlogCreate) -> BlogResponse:
+    async def create_blog(self, data: BlogCreate) -> dict:
         """
         Create new blog
         - Auto generate slug from title
         - Ensure slug is unique (if duplicate, append number)
         """
 
-        # Generate slug from title
-        slug = slugify(data.title)
-
-        # Check if slug already exists, if yes append number
-        existing = await self.repo.get_by_slug(slug)
-        if existing:
-            # Find a unique slug by appending number
-            counter = 1
-            while existing:
-                slug_with_number = f"{slugify(data.title)}-{counter}"
-                existing = await self.repo.get_by_slug(slug_with_number)
-                if not existing:
-                    slug = slug_with_number
-                    break
-                counter += 1
+        blog, extra = self._new_blog(data)
+
+        base_slug = blog.slug
+        for _ in range(SLUG_ALLOCATION_ATTEMPTS):
+            # One query for the free suffix; a concurrent create that wins
+            # the same slug surfaces as SlugConflictError, so allocate again
+            blog.slug = await self.repo.allocate_slug(base_slug)
+            try:
+                created = await self.repo.create(blog, extra=extra)
+                break
+            except SlugConflictError:
+                continue
+        else:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="Slug already exists",
+            )
 
+        feed_index.apply(created)
+        return self._to_response(created)
+
+    @staticmethod
+    def _new_blog(data: BlogCreate) -> tuple[BlogModel, dict]:
+        """Returns: (blog with its base slug, extra stored fields)"""
         blog = BlogModel(
             title=data.title,
-            slug=slug,
+            slug=slugify(data.title),
             summary=data.summary,
             content=data.content,
             cover_image=data.cover_image,
             tags=data.tags,
             published=data.published,
         )
+        # Keep the n-gram search fields in step with the post
+        extra = ngram.search_fields({"title": data.title, "summary": data.summary})
+        return blog, extra
 
-        try:
-            created = await self.repo.create(blog)
-        except ValueError as e:
-            raise HTTPException(
-                status_code=status.HTTP_409_CONFLICT,
-                detail=str(e),
+    # ----------------------
+    # Bulk import
+    # ----------------------
+    async def import_blogs(
+        self,
+        lines: AsyncIterable[tuple[int, Optional[bytes]]],
+        batch_size: int = 500,
+    ) -> AsyncIterator[dict]:
+        """
+        Create blogs from NDJSON lines of BlogCreate, batch_size at a time
+        - Slugs for a whole batch are allocated with one query and the
+          batch is written with one unordered insert_many
+        - Only one batch is held in memory at a time
+        lines: (line number, line or None if it was too long)
+        Yields: one result per line, then a summary
+          {"line", "status": "created", "id", "slug"}
+          {"line", "status": "invalid" | "failed", "detail"}
+          {"done": true, "created", "failed"}
+        Invalid lines are reported as they are read, created ones when
+        their batch has been written.
+        """
+        batch: list[tuple[int, BlogModel, dict]] = []
+        read = created = 0
+
+        async for number, line in lines:
+            read += 1
+            if line is None:
+                yield {"line": number, "status": "invalid", "detail": "Line too long"}
+                continue
+            try:
+                data = BlogCreate.model_validate_json(line)
+            except ValidationError as e:
+                yield {
+                    "line": number,
+                    "status": "invalid",
+                    "detail": e.errors(
+                        include_url=False, include_input=False, include_context=False
+                    ),
+                }
+                continue
+
+            batch.append((number, *self._new_blog(data)))
+            if len(batch) >= batch_size:
+                async for result in self._import_batch(batch):
+                    created += result["status"] == "created"
+                    yield result
+                batch = []
+
+        async for result in self._import_batch(batch):
+            created += result["status"] == "created"
+            yield result
+
+        yield {"done": True, "created": created, "failed": read - created}
+
+    async def _import_batch(
+        self,
+        batch: list[tuple[int, BlogModel, dict]],
+    ) -> AsyncIterator[dict]:
+        # Base slug per entry; models carry the allocated one
+        pending = [(number, blog, extra, blog.slug) for number, blog, extra in batch]
+
+        for _ in range(SLUG_ALLOCATION_ATTEMPTS):
+            if not pending:
+                return
+            taken = await self.repo.taken_slug_suffixes(
+                {base for *_, base in pending}
             )
+            for _, blog, _, base in pending:
+                blog.slug = self.repo.claim_slug(base, taken[base])
 
-        return self._to_response(created)
+            errors = await self.repo.create_many(
+                [(blog, extra) for _, blog, extra, _ in pending]
+            )
+
+            retry = []
+            for index, (number, blog, extra, base) in enumerate(pending):
+                error = errors.get(index)
+                if error is None:
+                    feed_index.apply(blog)
+                    yield {
+                        "line": number,
+                        "status": "created",
+                        "id": str(blog.id),
+                        "slug": blog.slug,
+                    }
+                elif isinstance(error, SlugConflictError):
+                    # Taken by a concurrent write since the allocation
+                    retry.append((number, blog, extra, base))
+                else:
+                    yield {"line": number, "status": "failed", "detail": str(error)}
+            pending = retry
+
+        for number, *_ in pending:
+            yield {"line": number, "status": "failed", "detail": "Slug already exists"}
 
     # ----------------------
     # Get by ID
     # ----------------------
-    async def get_blog_by_id(self, blog_id: str) -> BlogResponse:
-        blog = await self.repo.get_by_id(blog_id)
+    async def get_blog_by_id(self, blog_id: str, max_staleness: float = 0) -> dict:
+        blog = await self.repo.get_by_id(blog_id, max_staleness=max_staleness)
         if not blog:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -85,8 +199,8 @@ class BlogService:
     # ----------------------
     # Get by Slug (SEO / public)
     # ----------------------
-    async def get_blog_by_slug(self, slug: str) -> BlogResponse:
-        blog = await self.repo.get_by_slug(slug)
+    async def get_blog_by_slug(self, slug: str, max_staleness: float = 0) -> dict:
+        blog = await self.repo.get_by_slug(slug, max_staleness=max_staleness)
         if not blog:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -95,6 +209,35 @@ class BlogService:
 
         return self._to_response(blog)
 
+    # ----------------------
+    # HTTP validators
+    # ----------------------
+    @staticmethod
+    def blog_validators(
+        blog_id: str,
+        created_at: datetime,
+        updated_at: Optional[datetime],
+    ) -> tuple[str, datetime]:
+        """Returns: (strong ETag, Last-Modified) of one blog"""
+        modified = updated_at or created_at
+        return make_etag((blog_id, modified)), modified
+
+    async def get_blog_validators(
+        self,
+        blog_id: Optional[str] = None,
+        slug: Optional[str] = None,
+        max_staleness: float = 0,
+    ) -> Optional[tuple[str, datetime]]:
+        """Validators without loading the blog body; None if not found"""
+        version = await self.repo.get_version(
+            blog_id=blog_id, slug=slug, max_staleness=max_staleness
+        )
+        if not version:
+            return None
+        return self.blog_validators(
+            str(version["_id"]), version["created_at"], version.get("updated_at")
+        )
+
     # ----------------------
     # List
     # ----------------------
@@ -106,20 +249,174 @@ class BlogService:
         sort_by: str = "created_date_desc",
         limit: int = 20,
         skip: int = 0,
+        cursor: Optional[str] = None,
+        with_total: WithTotal = "exact",
+        fields: str = "",
+        max_staleness: float = 0,
+    ) -> tuple[dict, str, Optional[datetime]]:
+        """
+        List blogs with filtering and sorting
+        - Items are BlogListItem (no content) by default
+        - fields="title,slug,..." returns only those fields (plus id)
+        - Pages are cached per blogs generation; max_staleness lets the
+          generation seen by this worker be reused for that many seconds
+          (pages with content are never cached)
+        Returns: (page, ETag, Last-Modified of the newest item)
+        """
+        selected = None
+        if fields:
+            names = [f.strip() for f in fields.split(",") if f.strip()]
+            selected = list(dict.fromkeys(names))
+            unknown = [f for f in selected if f not in BLOG_FIELDS]
+            if unknown:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail=f"Unknown fields: {', '.join(unknown)}",
+                )
+
+        cache_key = None
+        if not selected or "content" not in selected:
+            generation = await blog_generation.current(max_age=max_staleness)
+            cache_key = (
+                generation,
+                published,
+                title.strip(),
+                tuple(sorted({t.strip() for t in tags.split(",")})) if tags else (),
+                resolve_sort(sort_by)[0],
+                limit,
+                0 if cursor else skip,
+                cursor,
+                with_total,
+                tuple(selected) if selected else None,
+            )
+            cached = list_cache.get(cache_key)
+            if cached is not None:
+                return cached
+
+        try:
+            blogs, total, next_cursor = await self.repo.list(
+                published=published,
+                title=title,
+                tags=tags,
+                sort_by=sort_by,
+                limit=limit,
+                skip=skip,
+                cursor=cursor,
+                with_total=with_total,
+                fields=selected,
+            )
+        except ValueError as e:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=str(e),
+            )
+
+        page = {
+            "total": total,
+            "items": [self._to_list_item(b, selected) for b in blogs],
+            "next_cursor": next_cursor,
+            "has_more": next_cursor is not None,
+        }
+
+        # Any edit bumps updated_at; adds/removes change the ids or total
+        modified = [b.updated_at or b.created_at for b in blogs]
+        etag = make_etag((
+            *(f"{b.id}@{m.isoformat()}" for b, m in zip(blogs, modified)),
+            total,
+            next_cursor,
+            fields,
+        ))
+        result = (page, etag, max(modified, default=None))
+        if cache_key is not None:
+            list_cache.set(cache_key, result)
+        return result
+
+    # ----------------------
+    # Export
+    # ----------------------
+    def export_blogs(
+        self,
+        published: Optional[bool] = None,
+        title: str = "",
+        tags: str = "",
+        after: Optional[str] = None,
+        batch_size: int = 1000,
+    ) -> AsyncIterator[dict]:
+        """
+        Stream matching blogs as BlogResponse-shaped dicts in _id order
+        - Same filters as list_blogs; no cache, reads MongoDB directly
+        - after: id of the last blog already received, to resume
+        Errors are raised here, before streaming starts
+        """
+        try:
+            cursor = self.repo.export_cursor(
+                published=published,
+                title=title,
+                tags=tags,
+                after=after,
+                batch_size=batch_size,
+            )
+        except ValueError as e:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=str(e),
+            )
+        return ndjson.export_documents(cursor, RESPONSE_FIELDS)
+
+    # ----------------------
+    # Search
+    # ----------------------
+    async def search_blogs(
+        self,
+        q: str,
+        published: Optional[bool] = None,
+        tags: str = "",
+        limit: int = 20,
+        skip: int = 0,
+        with_total: WithTotal = "exact",
     ) -> dict:
-        """List blogs with filtering and sorting"""
-        blogs, total = await self.repo.list(
+        """Full-text search, most relevant first"""
+        results, total, has_more = await self.repo.search(
+            q,
             published=published,
-            title=title,
             tags=tags,
-            sort_by=sort_by,
             limit=limit,
             skip=skip,
+            with_total=with_total,
         )
 
         return {
             "total": total,
-            "items": [self._to_response(b) for b in blogs]
+            "items": [
+                {**self._to_list_item(blog), "score": score}
+                for blog, score in results
+            ],
+            "has_more": has_more,
+        }
+
+    async def search_blogs_substring(
+        self,
+        q: str,
+        published: Optional[bool] = None,
+        tags: str = "",
+        limit: int = 20,
+        skip: int = 0,
+        with_total: WithTotal = "exact",
+    ) -> dict:
+        """Substring search over title and summary (Thai-friendly)"""
+        blogs, total, has_more = await self.repo.search_substring(
+            q,
+            published=published,
+            tags=tags,
+            limit=limit,
+            skip=skip,
+            with_total=with_total,
+        )
+
+        return {
+            "total": total,
+            "items": [self._to_list_item(blog) for blog in blogs],
+            "has_more": has_more,
         }
 
     # ----------------------
@@ -129,63 +426,72 @@ class BlogService:
         self,
         blog_id: str,
         data: BlogUpdate,
-    ) -> BlogResponse:
+    ) -> dict:
         """Update blog - regenerate slug if title changes"""
         update_data = data.model_dump(exclude_unset=True)
 
+        # Re-index search fields for whichever of title/summary changed
+        update_data.update(ngram.search_fields(update_data))
+
         # If title is being updated, regenerate slug
-        if "title" in update_data:
-            new_title = update_data["title"]
-            new_slug = slugify(new_title)
-
-            # Check if new slug already exists (from different blog)
-            existing_slug = await self.repo.get_by_slug(new_slug)
-            if existing_slug and str(existing_slug.id) != blog_id:
-                # Append number to make it unique
-                counter = 1
-                while existing_slug:
-                    new_slug_with_number = f"{slugify(new_title)}-{counter}"
-                    existing_slug = await self.repo.get_by_slug(new_slug_with_number)
-                    if not existing_slug:
-                        new_slug = new_slug_with_number
-                        break
-                    counter += 1
-
-            update_data["slug"] = new_slug
-
-        blog = await self.repo.update(blog_id, update_data)
+        if "title" not in update_data:
+            blog = await self.repo.update(blog_id, update_data)
+        else:
+            base_slug = slugify(update_data["title"])
+            for _ in range(SLUG_ALLOCATION_ATTEMPTS):
+                update_data["slug"] = await self.repo.allocate_slug(
+                    base_slug, blog_id=blog_id
+                )
+                try:
+                    blog = await self.repo.update(blog_id, update_data)
+                    break
+                except SlugConflictError:
+                    continue
+            else:
+                raise HTTPException(
+                    status_code=status.HTTP_409_CONFLICT,
+                    detail="Slug already exists",
+                )
+
         if not blog:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Blog not found",
             )
 
+        feed_index.apply(blog)
         return self._to_response(blog)
 
     # ----------------------
     # Delete
     # ----------------------
     async def delete_blog(self, blog_id: str) -> None:
+        # n-gram postings live on the blog document and go with it
         deleted = await self.repo.delete(blog_id)
         if not deleted:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Blog not found",
             )
+        feed_index.remove(blog_id)
 
     # ----------------------
     # Mapper
     # ----------------------
-    def _to_response(self, blog: BlogModel) -> BlogResponse:
-        return BlogResponse(
-            id=str(blog.id),
-            title=blog.title,
-            slug=blog.slug,
-            summary=blog.summary,
-            content=blog.content,
-            cover_image=blog.cover_image,
-            tags=blog.tags,
-            published=blog.published,
-            created_at=blog.created_at,
-            updated_at=blog.updated_at,
-        )
+    # Plain dicts shaped like BlogListItem / BlogResponse, encoded
+    # directly by MongoJSONResponse without pydantic validation
+    def _to_list_item(
+        self,
+        blog: BlogModel,
+        fields: Optional[List[str]] = None,
+    ) -> dict:
+        item = {"id": str(blog.id)}
+        for field in LIST_ITEM_FIELDS if fields is None else fields:
+            item[field] = getattr(blog, field)
+        return item
+
+    def _to_response(self, blog: BlogModel) -> dict:
+        item = {"id": str(blog.id)}
+        for field in RESPONSE_FIELDS:
+            item[field] = getattr(blog, field)
+        return item
@@ -1,5 +1,5 @@
 from datetime import datetime
-from typing import Literal
+from typing import Literal, Optional
 from pydantic import BaseModel, Field
 from bson import ObjectId
 
@@ -14,6 +14,8 @@ class UserModel(BaseModel):
     status: Literal["active", "inactive"] = "active"  # soft delete
     created_at: datetime = Field(default_factory=datetime.utcnow)
     updated_at: datetime = Field(default_factory=datetime.utcnow)
+    # Tokens issued before this are rejected ("log out everywhere")
+    tokens_valid_after: Optional[datetime] = None
 
     class Config:
         populate_by_name = True
@@ -1,20 +1,67 @@
-from typing import List, Optional
+from typing import Any, List, Optional
 from datetime import datetime
 from bson import ObjectId
-
-from app.core.database import get_database
+from motor.motor_asyncio import AsyncIOMotorCursor
+
+from app.core.database import (
+    WithTotal,
+    find_page,
+    get_database,
+    verify_query_plans,
+)
+from app.modules.auth.revocation import revocation_filter
 from app.modules.users.model import UserModel
-from app.modules.users.schema import UserCreate, UserUpdate
+from app.modules.users.schema import UserCreate, UserResponse, UserUpdate
+from app.utils.logger import init_logger
+
+logger = init_logger(__name__)
+
+# Fields a user listing returns; never password_hash
+PUBLIC_PROJECTION = {f: 1 for f in UserResponse.model_fields if f != "id"}
 
 
 class UserRepository:
     """Data access layer for users collection"""
 
+    async def ensure_indexes(self) -> None:
+        """
+        Call once on startup
+        """
+        db = get_database()
+        indexes = [
+            # get_by_username / check_username_exists / login
+            (["username"], {"unique": True}),
+            # get_by_email / check_email_exists
+            (["email"], {"unique": True}),
+            # get_all(status=...) ordered by created_at, _id breaking ties
+            ([("status", 1), ("created_at", 1), ("_id", 1)], {}),
+            # revocation epoch sync polls on tokens_valid_after
+            (["tokens_valid_after"], {"sparse": True}),
+        ]
+        for keys, options in indexes:
+            try:
+                await db.users.create_index(keys, **options)
+            except Exception as e:
+                # e.g. duplicate usernames created before the unique index
+                logger.error(f"⚠️  Error creating users index {keys}: {e}")
+
+    async def verify_indexes(self) -> dict[str, list[str]]:
+        """Warn if any repository query shape still runs as a COLLSCAN"""
+        db = get_database()
+        shapes = {
+            "get_by_username": db.users.find({"username": ""}).limit(1),
+            "get_by_email": db.users.find({"email": ""}).limit(1),
+            "get_all": db.users.find({"status": "active"})
+            .sort([("created_at", 1), ("_id", 1)])
+            .limit(20),
+        }
+        return await verify_query_plans("users", shapes)
+
     async def create(self, user_data: UserCreate, password_hash: str) -> UserModel:
         """Create a new user"""
         db = get_database()
 
-        doc = {
+        doc: dict[str, Any] = {
             "username": user_data.username,
             "email": user_data.email,
             "password_hash": password_hash,
@@ -55,16 +102,56 @@ class UserRepository:
         skip: int = 0,
         limit: int = 20,
         status: str = "active",
-    ) -> tuple[List[UserModel], int]:
-        """Get all users (only active by default)"""
+        with_total: WithTotal = "exact",
+    ) -> tuple[List[dict], Optional[int], bool]:
+        """
+        Get all users (only active by default) as raw documents holding
+        only the public fields
+        Returns: (docs, total or None, has_more)
+        """
         db = get_database()
 
         query = {"status": status}
-        total = await db.users.count_documents(query)
+        users, total, has_more = await find_page(
+            db.users,
+            query,
+            [("created_at", 1), ("_id", 1)],
+            limit=limit,
+            skip=skip,
+            with_total=with_total,
+            projection=PUBLIC_PROJECTION,
+        )
+
+        return users, total, has_more
 
-        users = await db.users.find(query).skip(skip).limit(limit).to_list(length=None)
+    def export_cursor(
+        self,
+        status: Optional[str] = None,
+        after: Optional[str] = None,
+        batch_size: int = 1000,
+    ) -> AsyncIOMotorCursor:
+        """
+        Every user (or every user with the given status) in _id order,
+        public fields only
+        after: resume after this user id (exclusive)
+        Raises: ValueError on an invalid after id
+        """
+        db = get_database()
 
-        return [UserModel(**doc) for doc in users], total
+        query: dict = {}
+        if status is not None:
+            query["status"] = status
+        if after:
+            if not ObjectId.is_valid(after):
+                raise ValueError("Invalid after id")
+            query["_id"] = {"$gt": ObjectId(after)}
+
+        return (
+            db.users.find(query, PUBLIC_PROJECTION)
+            .sort("_id", 1)
+            .hint([("_id", 1)])
+            .batch_size(batch_size)
+        )
 
     async def update(self, user_id: str, update_data: UserUpdate) -> Optional[UserModel]:
         """Update user (PATCH)"""
@@ -75,7 +162,16 @@ class UserRepository:
         if not update_dict:
             return await self.get_by_id(user_id)
 
-        update_dict["updated_at"] = datetime.utcnow()
+        now = datetime.utcnow()
+        update_dict["updated_at"] = now
+
+        # The service hashes the new password before it gets here
+        if "password" in update_dict:
+            update_dict["password_hash"] = update_dict.pop("password")
+
+        # Password or role changes invalidate every outstanding token
+        if "password_hash" in update_dict or "is_admin" in update_dict:
+            update_dict["tokens_valid_after"] = now
 
         result = await db.users.find_one_and_update(
             {"_id": ObjectId(user_id)},
@@ -83,23 +179,45 @@ class UserRepository:
             return_document=True,
         )
 
+        if result and "tokens_valid_after" in update_dict:
+            revocation_filter.revoke_user(user_id, now)
+
         return UserModel(**result) if result else None
 
+    async def revoke_tokens(self, user_id: str) -> bool:
+        """Invalidate every token issued to the user so far (one write)"""
+        db = get_database()
+        now = datetime.utcnow()
+
+        result = await db.users.update_one(
+            {"_id": ObjectId(user_id)},
+            {"$set": {"tokens_valid_after": now}},
+        )
+        if result.matched_count:
+            revocation_filter.revoke_user(user_id, now)
+
+        return result.matched_count == 1
+
     async def soft_delete(self, user_id: str) -> Optional[UserModel]:
         """Soft delete user (set status to inactive)"""
         db = get_database()
+        now = datetime.utcnow()
 
         result = await db.users.find_one_and_update(
             {"_id": ObjectId(user_id)},
             {
                 "$set": {
                     "status": "inactive",
-                    "updated_at": datetime.utcnow(),
+                    "updated_at": now,
+                    "tokens_valid_after": now,
                 }
             },
             return_document=True,
         )
 
+        if result:
+            revocation_filter.revoke_user(user_id, now)
+
         return UserModel(**result) if result else None
 
     async def check_username_exists(self, username: str) -> bool:
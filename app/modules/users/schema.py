@@ -21,7 +21,7 @@ class UserUpdate(BaseModel):
 
 class UserResponse(BaseModel):
     """Response schema for user"""
-    id: str = Field(..., alias="_id")
+    id: str
     username: str
     email: str
     is_admin: bool
@@ -38,5 +38,6 @@ class UserResponse(BaseModel):
 
 class UserListResponse(BaseModel):
     """Response schema for list of users"""
-    total: int
+    total: Optional[int] = None  # None when listed with with_total=none
     items: list[UserResponse]
+    has_more: bool = False
@@ -1,9 +1,15 @@
-from typing import List, Optional
+from typing import AsyncIterator, Optional
 from bson import ObjectId
 
+from app.modules.users.model import UserModel
 from app.modules.users.repository import UserRepository
-from app.modules.users.schema import UserCreate, UserUpdate, UserResponse, UserListResponse
-from app.core.security import hash_password
+from app.modules.users.schema import UserCreate, UserUpdate, UserResponse
+from app.core.database import WithTotal
+from app.core.security import hash_password_async
+from app.utils import ndjson
+
+# Output fields (after id) in schema order
+RESPONSE_FIELDS = tuple(f for f in UserResponse.model_fields if f != "id")
 
 
 class UserService:
@@ -12,7 +18,7 @@ class UserService:
     def __init__(self):
         self.repository = UserRepository()
 
-    async def create_user(self, user_data: UserCreate) -> UserResponse:
+    async def create_user(self, user_data: UserCreate) -> dict:
         """Create a new user"""
         # Check if username or email already exists
         if await self.repository.check_username_exists(user_data.username):
@@ -22,64 +28,72 @@ class UserService:
             raise ValueError(f"Email '{user_data.email}' already exists")
 
         # Hash password
-        password_hash = hash_password(user_data.password)
+        password_hash = await hash_password_async(user_data.password)
 
         # Create user
         user = await self.repository.create(user_data, password_hash)
 
-        return UserResponse(
-            **user.dict(),
-            id=str(user.id),
-        )
+        return self._to_response(user)
 
-    async def get_user_by_id(self, user_id: str) -> Optional[UserResponse]:
+    async def get_user_by_id(self, user_id: str) -> Optional[dict]:
         """Get user by ID"""
         try:
             user = await self.repository.get_by_id(user_id)
             if not user:
                 return None
 
-            return UserResponse(
-                **user.dict(),
-                id=str(user.id),
-            )
+            return self._to_response(user)
         except Exception:
             return None
 
-    async def get_user_by_username(self, username: str) -> Optional[UserResponse]:
+    async def get_user_by_username(self, username: str) -> Optional[dict]:
         """Get user by username"""
         user = await self.repository.get_by_username(username)
         if not user:
             return None
 
-        return UserResponse(
-            **user.dict(),
-            id=str(user.id),
-        )
+        return self._to_response(user)
 
     async def get_all_users(
         self,
         skip: int = 0,
         limit: int = 20,
-    ) -> UserListResponse:
+        with_total: WithTotal = "exact",
+    ) -> dict:
         """Get all active users"""
-        users, total = await self.repository.get_all(
+        docs, total, has_more = await self.repository.get_all(
             skip=skip,
             limit=limit,
             status="active",
+            with_total=with_total,
         )
 
+        # Documents go straight to dicts, no model per user
         items = [
-            UserResponse(
-                **user.dict(),
-                id=str(user.id),
-            )
-            for user in users
+            {"id": str(doc["_id"]), **{f: doc.get(f) for f in RESPONSE_FIELDS}}
+            for doc in docs
         ]
 
-        return UserListResponse(total=total, items=items)
+        return {"total": total, "items": items, "has_more": has_more}
 
-    async def update_user(self, user_id: str, update_data: UserUpdate) -> Optional[UserResponse]:
+    def export_users(
+        self,
+        status: Optional[str] = None,
+        after: Optional[str] = None,
+        batch_size: int = 1000,
+    ) -> AsyncIterator[dict]:
+        """
+        Stream users as UserResponse-shaped dicts in _id order
+        Raises: ValueError on an invalid after id (before streaming starts)
+        """
+        cursor = self.repository.export_cursor(
+            status=status, after=after, batch_size=batch_size
+        )
+        return ndjson.export_documents(cursor, RESPONSE_FIELDS)
+
+    async def update_user(
+        self, user_id: str, update_data: UserUpdate
+    ) -> Optional[dict]:
         """Update user (PATCH)"""
         # Check if username is being updated and if it already exists
         if update_data.username:
@@ -96,19 +110,27 @@ class UserService:
 
         # Hash password if being updated
         if update_data.password:
-            update_data.password = hash_password(update_data.password)
+            update_data.password = await hash_password_async(update_data.password)
 
         user = await self.repository.update(user_id, update_data)
 
         if not user:
             return None
 
-        return UserResponse(
-            **user.dict(),
-            id=str(user.id),
-        )
+        return self._to_response(user)
 
     async def delete_user(self, user_id: str) -> bool:
-        """Soft delete user"""
+        """Soft delete user (also revokes all of the user's tokens)"""
         user = await self.repository.soft_delete(user_id)
         return user is not None
+
+    async def revoke_user_tokens(self, user_id: str) -> bool:
+        """Log the user out everywhere"""
+        return await self.repository.revoke_tokens(user_id)
+
+    def _to_response(self, user: UserModel) -> dict:
+        """UserResponse-shaped dict, encoded by MongoJSONResponse"""
+        item = {"id": str(user.id)}
+        for field in RESPONSE_FIELDS:
+            item[field] = getattr(user, field)
+        return item
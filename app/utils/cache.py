@@ -0,0 +1,104 @@
+"""
+In-process LRU cache with per-entry expiry.
+"""
+
+import sys
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Optional
+
+
+class TTLCache:
+    """
+    Bounded LRU cache where every entry carries its own deadline.
+
+    Entries are evicted least-recently-used first once ``maxsize`` is
+    reached, and lazily dropped on lookup once their TTL has passed.
+    With ``max_bytes`` the total ``sizeof(value)`` is bounded as well.
+    Not thread-safe: meant to be used from the event loop only.
+    """
+
+    def __init__(
+        self,
+        maxsize: int = 1024,
+        ttl: float = 300.0,
+        max_bytes: Optional[int] = None,
+        sizeof: Optional[Callable[[Any], int]] = None,
+    ):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.sizeof = sizeof or sys.getsizeof
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        # key -> (deadline, value, size in bytes)
+        self._data: OrderedDict[Hashable, tuple[float, Any, int]] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        entry = self._data.get(key)
+        if entry is None:
+            self.misses += 1
+            return default
+
+        deadline, value, size = entry
+        if deadline <= time.monotonic():
+            del self._data[key]
+            self.bytes -= size
+            self.misses += 1
+            return default
+
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        """Store value; ``ttl`` overrides the default and is capped by it"""
+        ttl = self.ttl if ttl is None else min(ttl, self.ttl)
+        if ttl <= 0 or self.maxsize <= 0:
+            return
+
+        size = self.sizeof(value) if self.max_bytes is not None else 0
+        self.pop(key)
+        if self.max_bytes is not None and size > self.max_bytes:
+            return
+
+        self._data[key] = (time.monotonic() + ttl, value, size)
+        self.bytes += size
+
+        while len(self._data) > self.maxsize or (
+            self.max_bytes is not None and self.bytes > self.max_bytes
+        ):
+            _, (_, _, evicted_size) = self._data.popitem(last=False)
+            self.bytes -= evicted_size
+            self.evictions += 1
+
+    def pop(self, key: Hashable) -> Any:
+        entry = self._data.pop(key, None)
+        if entry is None:
+            return None
+        self.bytes -= entry[2]
+        return entry[1]
+
+    def clear(self) -> None:
+        self._data.clear()
+        self.bytes = 0
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        stats = {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+        if self.max_bytes is not None:
+            stats["bytes"] = self.bytes
+            stats["max_bytes"] = self.max_bytes
+        return stats
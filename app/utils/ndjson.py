@@ -0,0 +1,148 @@
+"""
+Newline-delimited JSON (one JSON document per line) for streaming
+imports and exports.
+"""
+
+import zlib
+from tempfile import SpooledTemporaryFile
+from typing import Any, AsyncIterable, AsyncIterator, Iterable, Iterator, Optional
+
+from fastapi.responses import StreamingResponse
+from motor.motor_asyncio import AsyncIOMotorCursor
+
+from app.utils.serialization import dumps
+
+MEDIA_TYPE = "application/x-ndjson"
+
+
+def encode_line(obj: Any) -> bytes:
+    return dumps(obj) + b"\n"
+
+
+async def encode_lines(
+    items: AsyncIterable[Any],
+    chunk_size: int = 64 * 1024,
+) -> AsyncIterator[bytes]:
+    """Encode items as NDJSON, about chunk_size bytes per yielded chunk"""
+    buffer = bytearray()
+    async for item in items:
+        buffer += encode_line(item)
+        if len(buffer) >= chunk_size:
+            yield bytes(buffer)
+            buffer.clear()
+    if buffer:
+        yield bytes(buffer)
+
+
+async def gzip_chunks(
+    chunks: AsyncIterable[bytes], level: int = 6
+) -> AsyncIterator[bytes]:
+    """Compress a byte stream into one gzip member as it goes"""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    async for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+async def export_documents(
+    cursor: AsyncIOMotorCursor, fields: Iterable[str]
+) -> AsyncIterator[dict]:
+    """
+    Documents from cursor as API-shaped dicts ({"id": str(_id), **fields});
+    the cursor is closed at the end, also when the client goes away
+    mid-stream
+    """
+    fields = tuple(fields)
+    try:
+        async for doc in cursor:
+            yield {"id": str(doc["_id"]), **{f: doc.get(f) for f in fields}}
+    finally:
+        await cursor.close()
+
+
+def stream_response(
+    items: AsyncIterable[Any],
+    gzip: bool = False,
+    gzip_level: int = 6,
+) -> StreamingResponse:
+    """
+    NDJSON response encoded while items are produced; with gzip the body
+    is sent with Content-Encoding: gzip
+    """
+    body = encode_lines(items)
+    headers = {}
+    if gzip:
+        body = gzip_chunks(body, gzip_level)
+        headers["Content-Encoding"] = "gzip"
+    return StreamingResponse(body, media_type=MEDIA_TYPE, headers=headers)
+
+
+async def iter_lines(
+    chunks: AsyncIterable[bytes],
+    max_line_bytes: int,
+) -> AsyncIterator[tuple[int, Optional[bytes]]]:
+    """
+    Split a byte stream into lines without holding more than one line
+    (plus one chunk) in memory
+    Yields: (line number, line) for non-blank lines; line is None when it
+    was longer than max_line_bytes and has been dropped
+    """
+    buffer = b""
+    number = 0
+    overflow = False
+
+    async for chunk in chunks:
+        buffer += chunk
+        start = 0
+        while True:
+            end = buffer.find(b"\n", start)
+            if end < 0:
+                break
+            line = buffer[start:end]
+            start = end + 1
+            number += 1
+            if overflow:
+                overflow = False
+                yield number, None
+            elif len(line) > max_line_bytes:
+                yield number, None
+            elif line.strip():
+                yield number, line
+        buffer = buffer[start:]
+
+        if len(buffer) > max_line_bytes:
+            # Drop the rest of this line as it arrives
+            overflow = True
+            buffer = b""
+
+    if overflow:
+        yield number + 1, None
+    elif buffer.strip():
+        yield number + 1, buffer
+
+
+async def spool(items: AsyncIterable[Any], max_memory: int) -> SpooledTemporaryFile:
+    """
+    Encode items as NDJSON into a temporary file kept in memory up to
+    max_memory bytes and on disk beyond; rewound, ready for iter_file()
+    """
+    file = SpooledTemporaryFile(max_size=max_memory)
+    try:
+        async for item in items:
+            file.write(encode_line(item))
+    except BaseException:
+        file.close()
+        raise
+    file.seek(0)
+    return file
+
+
+def iter_file(file, chunk_size: int = 64 * 1024) -> Iterator[bytes]:
+    """Read a file in chunks and close it (a StreamingResponse body)"""
+    try:
+        while chunk := file.read(chunk_size):
+            yield chunk
+    finally:
+        file.close()
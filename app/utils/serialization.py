@@ -0,0 +1,41 @@
+"""
+Fast JSON encoding for MongoDB-shaped data.
+
+Plain dicts/lists straight from MongoDB (ObjectId, datetime) are encoded
+to bytes in one pass with orjson, skipping pydantic response_model
+validation.
+"""
+
+from datetime import datetime
+from typing import Any
+
+import orjson
+from bson import ObjectId
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+
+def _default(obj: Any) -> Any:
+    if isinstance(obj, ObjectId):
+        return str(obj)
+    if isinstance(obj, datetime):
+        # Same form as pydantic: naive stays naive (UTC by convention)
+        return obj.isoformat()
+    if isinstance(obj, BaseModel):
+        return obj.model_dump(mode="json")
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def dumps(obj: Any) -> bytes:
+    return orjson.dumps(obj, default=_default)
+
+
+class MongoJSONResponse(JSONResponse):
+    """
+    JSONResponse for dicts built from MongoDB documents
+    Return it from a handler to skip response_model validation; keep
+    response_model on the route for the OpenAPI schema.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
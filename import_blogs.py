@@ -0,0 +1,79 @@
+"""
+Script สำหรับ import บทความจากไฟล์ NDJSON (หนึ่ง BlogCreate ต่อบรรทัด)
+Same behavior as POST /api/v1/blogs/import, straight against MongoDB
+
+    python3 import_blogs.py posts.ndjson
+    python3 import_blogs.py - < posts.ndjson > results.ndjson
+    python3 import_blogs.py posts.ndjson --batch-size 1000
+
+Per-line results are written to stdout as NDJSON, the summary to stderr.
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+from typing import AsyncIterator, BinaryIO
+
+from motor.motor_asyncio import AsyncIOMotorClient
+
+from app.core import database
+from app.core.config import settings
+from app.modules.blogs.repository import BlogRepository
+from app.modules.blogs.service import BlogService
+from app.utils import ndjson
+
+
+async def read_chunks(
+    file: BinaryIO, chunk_size: int = 64 * 1024
+) -> AsyncIterator[bytes]:
+    while chunk := file.read(chunk_size):
+        yield chunk
+
+
+async def import_blogs(file: BinaryIO, batch_size: int) -> dict:
+    # เชื่อมต่อ MongoDB
+    database.client = AsyncIOMotorClient(settings.mongo_uri)
+    try:
+        # The unique slug index is what catches concurrent slug conflicts
+        await BlogRepository().ensure_indexes()
+
+        lines = ndjson.iter_lines(read_chunks(file), settings.import_max_line_bytes)
+        summary = {}
+        async for result in BlogService().import_blogs(lines, batch_size=batch_size):
+            if result.get("done"):
+                summary = result
+            else:
+                sys.stdout.buffer.write(ndjson.encode_line(result))
+        sys.stdout.flush()
+        return summary
+    finally:
+        database.client.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("path", help="NDJSON file, or - for stdin")
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=settings.import_batch_size,
+        help="Blogs per insert_many",
+    )
+    args = parser.parse_args()
+
+    if args.path == "-":
+        summary = asyncio.run(import_blogs(sys.stdin.buffer, args.batch_size))
+    else:
+        with open(args.path, "rb") as file:
+            summary = asyncio.run(import_blogs(file, args.batch_size))
+
+    print(f"✓ Import เสร็จสิ้น: {json.dumps(summary)}", file=sys.stderr)
+    if summary.get("failed"):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
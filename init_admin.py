@@ -5,7 +5,7 @@ Script สำหรับสร้าง Admin account เริ่มต้น
 import asyncio
 from motor.motor_asyncio import AsyncIOMotorClient
 from app.core.config import settings
-from app.core.security import hash_password
+from app.core.security import hash_password_async, password_pool
 
 
 async def init_admin():
@@ -30,7 +30,7 @@ async def init_admin():
     # สร้าง admin account
     admin_doc = {
         "username": admin_username,
-        "password_hash": hash_password(admin_password),
+        "password_hash": await hash_password_async(admin_password),
         "email": "admin@example.com",
         "is_admin": True,
         "is_active": True,
@@ -44,6 +44,7 @@ async def init_admin():
     print(f"  ID: {result.inserted_id}")
     print("\n⚠️  อย่าลืมเปลี่ยน password ในไฟล์นี้เป็นค่าจริงก่อนใช้งาน")
 
+    password_pool.shutdown()
     client.close()
 
 
@@ -9,6 +9,7 @@ from app.core.dependencies import get_current_admin
 from app.core.config import settings
 from app.core.lifespan import lifespan
 from app.api.v1.router import router as v1_router
+from app.api.feeds import router as feeds_router
 from app.utils.logger import init_logger
 
 logger = init_logger(__name__)
@@ -21,6 +22,7 @@ app = FastAPI(
 )
 
 app.include_router(v1_router)
+app.include_router(feeds_router)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=settings.allow_origins,
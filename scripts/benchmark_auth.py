@@ -0,0 +1,281 @@
+"""
+Benchmark the authentication hot path
+Reports ops/sec and p50/p99 latency and stores results as JSON
+
+    python3 scripts/benchmark_auth.py              # throwaway keys, APP_MONGO_URI
+    python3 scripts/benchmark_auth.py --mongo-uri mongodb://localhost:27017
+    python3 scripts/benchmark_auth.py --mongomock  # no server needed
+    python3 scripts/benchmark_auth.py --compare bench_results/auth-old.json
+
+Token keys are generated into a temp dir unless --use-configured-keys is
+given. Runs against the configured MongoDB (settings.mongo_uri) unless
+--mongo-uri is set; --mongomock swaps in mongomock-motor, which is not a
+project dependency (pip install mongomock-motor).
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+from jwcrypto import jwk
+
+BASE_DIR = Path(__file__).parent.parent
+sys.path.insert(0, str(BASE_DIR))
+
+from app.core.tokens import symmetric_key_size  # noqa: E402
+
+
+def _write_temp_keys() -> None:
+    """Point every key path setting at freshly generated keys"""
+    keys_dir = Path(tempfile.mkdtemp(prefix="bench-keys-"))
+
+    rsa_key = jwk.JWK.generate(kty="RSA", size=2048)
+    (keys_dir / "private_key.pem").write_bytes(
+        rsa_key.export_to_pem(private_key=True, password=None)
+    )
+    (keys_dir / "public_key.pem").write_bytes(rsa_key.export_to_pem())
+
+    ec_key = jwk.JWK.generate(kty="EC", crv="P-256")
+    (keys_dir / "ec_private_key.pem").write_bytes(
+        ec_key.export_to_pem(private_key=True, password=None)
+    )
+    (keys_dir / "ec_public_key.pem").write_bytes(ec_key.export_to_pem())
+
+    enc = os.environ.get("APP_JWT_ENCRYPTION", "A192GCM")
+    secret_key = jwk.JWK.generate(kty="oct", size=symmetric_key_size(enc))
+    (keys_dir / "secret_key.json").write_text(secret_key.export())
+
+    os.environ.update(
+        {
+            "APP_JWT_PRIVATE_KEY_PATH": str(keys_dir / "private_key.pem"),
+            "APP_JWT_PUBLIC_KEY_PATH": str(keys_dir / "public_key.pem"),
+            "APP_JWT_EC_PRIVATE_KEY_PATH": str(keys_dir / "ec_private_key.pem"),
+            "APP_JWT_EC_PUBLIC_KEY_PATH": str(keys_dir / "ec_public_key.pem"),
+            "APP_JWT_SECRET_KEY_PATH": str(keys_dir / "secret_key.json"),
+        }
+    )
+
+
+def _summarize(name: str, latencies_ns: list[int], elapsed: float) -> dict:
+    latencies = sorted(latencies_ns)
+
+    def pct(p: float) -> float:
+        index = min(len(latencies) - 1, int(round(p / 100 * (len(latencies) - 1))))
+        return latencies[index] / 1000  # microseconds
+
+    return {
+        "name": name,
+        "ops": len(latencies),
+        "ops_per_sec": round(len(latencies) / elapsed, 1),
+        "p50_us": round(pct(50), 1),
+        "p99_us": round(pct(99), 1),
+    }
+
+
+async def bench(name: str, func, seconds: float, min_ops: int = 5) -> dict:
+    """Call func (sync or async) repeatedly for ~seconds"""
+    latencies: list[int] = []
+    start = time.perf_counter()
+    deadline = start + seconds
+    while time.perf_counter() < deadline or len(latencies) < min_ops:
+        t0 = time.perf_counter_ns()
+        result = func()
+        if asyncio.iscoroutine(result):
+            await result
+        latencies.append(time.perf_counter_ns() - t0)
+    return _summarize(name, latencies, time.perf_counter() - start)
+
+
+def _git_commit() -> str | None:
+    try:
+        return (
+            subprocess.check_output(
+                ["git", "rev-parse", "--short", "HEAD"],
+                cwd=BASE_DIR,
+                stderr=subprocess.DEVNULL,
+            )
+            .decode()
+            .strip()
+        )
+    except Exception:
+        return None
+
+
+async def run(seconds: float, mongo_uri: str | None, mongomock: bool) -> dict:
+    from bson import ObjectId
+    from fastapi.security import HTTPAuthorizationCredentials
+
+    from app.core import database, security
+    from app.core.config import settings
+    from app.core.dependencies import get_current_admin
+    from app.modules.auth.revocation import revocation_filter
+
+    if mongomock:
+        try:
+            from mongomock_motor import AsyncMongoMockClient
+        except ImportError:
+            raise SystemExit(
+                "--mongomock needs mongomock-motor: pip install mongomock-motor"
+            )
+        database.client = AsyncMongoMockClient()
+        backend = "mongomock"
+    else:
+        from motor.motor_asyncio import AsyncIOMotorClient
+
+        database.client = AsyncIOMotorClient(mongo_uri or settings.mongo_uri)
+        backend = "mongodb"
+
+    await database.init_indexes()
+
+    user_id = str(ObjectId())
+    token, _, _ = security.create_access_token(
+        subject="bench@example.com", user_id=user_id, is_admin=True
+    )
+    credentials = HTTPAuthorizationCredentials(scheme="Bearer", credentials=token)
+    password_hash = security.hash_password("Example@123")
+
+    def decode_cold():
+        security.token_cache.clear()
+        return security.decode_access_token(token)
+
+    def admin_cold():
+        security.token_cache.clear()
+        return get_current_admin(credentials)
+
+    results = [
+        await bench(
+            "create_access_token",
+            lambda: security.create_access_token(
+                subject="bench@example.com", user_id=user_id, is_admin=True
+            ),
+            seconds,
+        ),
+        await bench("decode_access_token (cold)", decode_cold, seconds),
+        await bench(
+            "decode_access_token (cached)",
+            lambda: security.decode_access_token(token),
+            seconds,
+        ),
+        await bench(
+            "hash_password",
+            lambda: security.hash_password("Example@123"),
+            seconds,
+        ),
+        await bench(
+            "verify_password",
+            lambda: security.verify_password("Example@123", password_hash),
+            seconds,
+        ),
+    ]
+
+    # As served: per-user epochs answered from the loaded filter
+    await revocation_filter.load()
+    results += [
+        await bench("get_current_admin (cold)", admin_cold, seconds),
+        await bench(
+            "get_current_admin (cached)",
+            lambda: get_current_admin(credentials),
+            seconds,
+        ),
+    ]
+    security.password_pool.shutdown()
+
+    return {
+        "timestamp": datetime.now(tz=timezone.utc).isoformat(),
+        "version": settings.version,
+        "commit": _git_commit(),
+        "python": platform.python_version(),
+        "mongo_backend": backend,
+        "settings": {
+            "token_format": settings.token_format,
+            "jwt_encryption": settings.jwt_encryption,
+            "bcrypt_rounds": settings.bcrypt_rounds,
+            "token_cache_size": settings.token_cache_size,
+        },
+        "results": results,
+    }
+
+
+def print_report(report: dict, baseline: dict | None = None) -> None:
+    previous = {r["name"]: r for r in (baseline or {}).get("results", [])}
+
+    header = f"{'benchmark':<32}{'ops/sec':>12}{'p50 µs':>12}{'p99 µs':>12}"
+    if previous:
+        header += f"{'vs base':>10}"
+    print(header)
+
+    for r in report["results"]:
+        line = (
+            f"{r['name']:<32}{r['ops_per_sec']:>12.1f}"
+            f"{r['p50_us']:>12.1f}{r['p99_us']:>12.1f}"
+        )
+        if r["name"] in previous and previous[r["name"]]["ops_per_sec"]:
+            change = r["ops_per_sec"] / previous[r["name"]]["ops_per_sec"] - 1
+            line += f"{change:>+10.1%}"
+        print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument(
+        "--seconds", type=float, default=1.0, help="Time spent on each benchmark"
+    )
+    parser.add_argument(
+        "--mongo-uri",
+        default=None,
+        help="MongoDB to benchmark against (default: settings)",
+    )
+    parser.add_argument(
+        "--mongomock",
+        action="store_true",
+        help="Use mongomock-motor instead of a MongoDB server",
+    )
+    parser.add_argument(
+        "--use-configured-keys",
+        action="store_true",
+        help="Use the key files from settings instead of temp keys",
+    )
+    parser.add_argument(
+        "--output",
+        type=Path,
+        default=None,
+        help="Result file (default: bench_results/auth-<time>.json)",
+    )
+    parser.add_argument(
+        "--compare",
+        type=Path,
+        default=None,
+        help="Previous result file to compare against",
+    )
+    args = parser.parse_args()
+
+    if not args.use_configured_keys:
+        _write_temp_keys()
+
+    report = asyncio.run(run(args.seconds, args.mongo_uri, args.mongomock))
+
+    baseline = json.loads(args.compare.read_text()) if args.compare else None
+    print_report(report, baseline)
+
+    output = args.output or (
+        BASE_DIR
+        / "bench_results"
+        / f"auth-{datetime.now().strftime('%Y%m%d-%H%M%S')}.json"
+    )
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2))
+    print(f"\n📁 Results saved to {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,271 @@
+"""
+Benchmark response serialization: the pydantic response_model path vs
+the MongoJSONResponse fast path, per request
+Reports latency (ops/sec, p50/p99) and peak memory allocated per request
+
+    python3 scripts/benchmark_serialization.py
+    python3 scripts/benchmark_serialization.py --items 100 --content-size 20000
+    python3 scripts/benchmark_serialization.py --compare bench_results/old.json
+
+Documents are generated in memory; no MongoDB is needed.
+"""
+
+import argparse
+import json
+import platform
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import bson
+from bson import ObjectId
+
+BASE_DIR = Path(__file__).parent.parent
+sys.path.insert(0, str(BASE_DIR))
+
+from benchmark_auth import (  # noqa: E402
+    _git_commit,
+    _summarize,
+    _write_temp_keys,
+    print_report,
+)
+
+
+def _blog_docs(count: int, content_size: int) -> list[dict]:
+    now = datetime(2026, 1, 1)
+    return [
+        {
+            "_id": ObjectId(),
+            "title": f"บทความที่ {i} - Post number {i}",
+            "slug": f"post-number-{i}",
+            "summary": "สรุปสั้น ๆ short summary " * 4,
+            "content": ("เนื้อหา content " * content_size)[:content_size],
+            "cover_image": f"https://example.com/covers/{i}.png",
+            "tags": ["python", "fastapi", "ไทย"],
+            "published": True,
+            "created_at": now + timedelta(minutes=i),
+            "updated_at": now + timedelta(hours=i),
+        }
+        for i in range(count)
+    ]
+
+
+def _user_docs(count: int) -> list[dict]:
+    now = datetime(2026, 1, 1)
+    return [
+        {
+            "_id": ObjectId(),
+            "username": f"user{i}",
+            "email": f"user{i}@example.com",
+            "password_hash": "$2b$12$" + "x" * 53,
+            "is_admin": False,
+            "status": "active",
+            "created_at": now,
+            "updated_at": now,
+        }
+        for i in range(count)
+    ]
+
+
+def _measure(name: str, func, seconds: float, min_ops: int = 5) -> dict:
+    """Time func repeatedly, then trace the allocations of a few calls"""
+    latencies: list[int] = []
+    start = time.perf_counter()
+    deadline = start + seconds
+    while time.perf_counter() < deadline or len(latencies) < min_ops:
+        t0 = time.perf_counter_ns()
+        func()
+        latencies.append(time.perf_counter_ns() - t0)
+    result = _summarize(name, latencies, time.perf_counter() - start)
+
+    # Traced separately: tracemalloc slows every allocation down.
+    # Peak includes transient buffers: orjson reserves room for the worst
+    # case when encoding long non-ASCII (e.g. Thai) strings.
+    peaks = []
+    tracemalloc.start()
+    for _ in range(min_ops):
+        baseline = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        func()
+        peaks.append(tracemalloc.get_traced_memory()[1] - baseline)
+    tracemalloc.stop()
+    result["alloc_kib"] = round(sorted(peaks)[len(peaks) // 2] / 1024, 1)
+    return result
+
+
+def run(seconds: float, items: int, content_size: int) -> dict:
+    from fastapi.encoders import jsonable_encoder
+    from fastapi.responses import JSONResponse
+
+    from app.modules.blogs.model import BlogModel
+    from app.modules.blogs.repository import LIST_PROJECTION
+    from app.modules.blogs.schema import BlogListItem, BlogResponse
+    from app.modules.blogs.service import BlogService
+    from app.modules.users.model import UserModel
+    from app.modules.users.schema import UserResponse
+    from app.modules.users.service import RESPONSE_FIELDS as USER_FIELDS
+    from app.utils.serialization import MongoJSONResponse
+
+    service = BlogService()
+    blog_docs = _blog_docs(items, content_size)
+    user_docs = _user_docs(items)
+    # Listings read LIST_PROJECTION-shaped documents (no content)
+    list_docs = [
+        {k: v for k, v in doc.items() if k == "_id" or k in LIST_PROJECTION}
+        for doc in blog_docs
+    ]
+    # As they come off the wire, to include the driver's BSON decoding
+    list_wire = [bson.encode(doc) for doc in list_docs]
+    get_wire = bson.encode(blog_docs[0])
+
+    # The previous code path: pydantic model per item, then response_model
+    # validation and jsonable_encoder before json.dumps
+    def blog_list_pydantic():
+        blogs = [BlogModel.from_mongo(doc) for doc in list_docs]
+        page = {
+            "total": len(blogs),
+            "items": [
+                BlogListItem(
+                    id=str(b.id),
+                    **{
+                        f: getattr(b, f) for f in BlogListItem.model_fields if f != "id"
+                    },
+                )
+                for b in blogs
+            ],
+            "next_cursor": None,
+            "has_more": False,
+        }
+        return JSONResponse(jsonable_encoder(page)).body
+
+    def blog_list_fast(docs=list_docs):
+        blogs = [BlogModel.from_mongo(doc) for doc in docs]
+        page = {
+            "total": len(blogs),
+            "items": [service._to_list_item(b) for b in blogs],
+            "next_cursor": None,
+            "has_more": False,
+        }
+        return MongoJSONResponse(page).body
+
+    def blog_get_pydantic():
+        blog = BlogModel.from_mongo(blog_docs[0])
+        response = BlogResponse.model_validate({"id": str(blog.id), **blog.to_dict()})
+        return JSONResponse(jsonable_encoder(response)).body
+
+    def blog_get_fast(docs=blog_docs):
+        blog = BlogModel.from_mongo(docs[0])
+        return MongoJSONResponse(service._to_response(blog)).body
+
+    def blog_list_decode():
+        return blog_list_fast([bson.decode(raw) for raw in list_wire])
+
+    def blog_get_decode():
+        return blog_get_fast([bson.decode(get_wire)])
+
+    def user_list_pydantic():
+        users = [UserModel(**doc) for doc in user_docs]
+        items = [
+            UserResponse(id=str(u.id), **{f: getattr(u, f) for f in USER_FIELDS})
+            for u in users
+        ]
+        return JSONResponse(
+            jsonable_encoder({"total": len(items), "items": items, "has_more": False})
+        ).body
+
+    def user_list_fast():
+        items = [
+            {"id": str(doc["_id"]), **{f: doc.get(f) for f in USER_FIELDS}}
+            for doc in user_docs
+        ]
+        return MongoJSONResponse(
+            {"total": len(items), "items": items, "has_more": False}
+        ).body
+
+    # Both paths must produce the same document
+    for slow, fast in [
+        (blog_list_pydantic, blog_list_fast),
+        (blog_list_pydantic, blog_list_decode),
+        (blog_get_pydantic, blog_get_fast),
+        (blog_get_pydantic, blog_get_decode),
+        (user_list_pydantic, user_list_fast),
+    ]:
+        assert json.loads(slow()) == json.loads(fast()), slow.__name__
+
+    results = [
+        _measure(f"blog list x{items} (pydantic)", blog_list_pydantic, seconds),
+        _measure(f"blog list x{items} (fast)", blog_list_fast, seconds),
+        _measure(f"blog list x{items} (+ bson)", blog_list_decode, seconds),
+        _measure("blog get (pydantic)", blog_get_pydantic, seconds),
+        _measure("blog get (fast)", blog_get_fast, seconds),
+        _measure("blog get (+ bson)", blog_get_decode, seconds),
+        _measure(f"user list x{items} (pydantic)", user_list_pydantic, seconds),
+        _measure(f"user list x{items} (fast)", user_list_fast, seconds),
+    ]
+
+    import orjson
+
+    return {
+        "timestamp": datetime.now().astimezone().isoformat(),
+        "commit": _git_commit(),
+        "python": platform.python_version(),
+        "settings": {
+            "items": items,
+            "content_size": content_size,
+            "orjson": orjson.__version__,
+        },
+        "results": results,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument(
+        "--seconds", type=float, default=1.0, help="Time spent on each benchmark"
+    )
+    parser.add_argument(
+        "--items", type=int, default=20, help="Documents per list response"
+    )
+    parser.add_argument(
+        "--content-size", type=int, default=5000, help="Characters of content per blog"
+    )
+    parser.add_argument(
+        "--output",
+        type=Path,
+        default=None,
+        help="Result file (default: bench_results/serialization-<time>.json)",
+    )
+    parser.add_argument(
+        "--compare",
+        type=Path,
+        default=None,
+        help="Previous result file to compare against",
+    )
+    args = parser.parse_args()
+
+    # app.core.security loads token keys on import
+    _write_temp_keys()
+    report = run(args.seconds, args.items, args.content_size)
+
+    baseline = json.loads(args.compare.read_text()) if args.compare else None
+    print_report(report, baseline)
+    print()
+    for r in report["results"]:
+        print(f"{r['name']:<32}{r['alloc_kib']:>12.1f} KiB allocated")
+
+    output = args.output or (
+        BASE_DIR
+        / "bench_results"
+        / f"serialization-{datetime.now().strftime('%Y%m%d-%H%M%S')}.json"
+    )
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2))
+    print(f"\n📁 Results saved to {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""
+Benchmark create/decode throughput for every token format
+Keys are generated in memory, so no key files are needed
+
+    python3 scripts/benchmark_tokens.py --seconds 2
+"""
+
+import argparse
+import sys
+import time
+import uuid
+from pathlib import Path
+
+from jwcrypto import jwk
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.core.tokens import TokenEngine, decode_token, symmetric_key_size  # noqa: E402
+
+
+def build_engines(enc: str) -> list[TokenEngine]:
+    """One engine per token format, with throwaway keys"""
+    rsa_key = jwk.JWK.generate(kty="RSA", size=2048)
+    ec_key = jwk.JWK.generate(kty="EC", crv="P-256")
+    secret_key = jwk.JWK.generate(kty="oct", size=symmetric_key_size(enc))
+
+    return [
+        TokenEngine(
+            "rsa", enc, jwk.JWK(**rsa_key.export_public(as_dict=True)), rsa_key
+        ),
+        TokenEngine("dir", enc, secret_key),
+        TokenEngine("ecdh", enc, jwk.JWK(**ec_key.export_public(as_dict=True)), ec_key),
+    ]
+
+
+def sample_payload() -> dict:
+    now = time.time()
+    return {
+        "iat": now,
+        "exp": now + 900,
+        "sub": "admin@example.com",
+        "jti": str(uuid.uuid4()),
+    }
+
+
+def measure(func, seconds: float) -> float:
+    """Run func repeatedly for ~seconds, return ops/sec"""
+    ops = 0
+    start = time.perf_counter()
+    deadline = start + seconds
+    while time.perf_counter() < deadline:
+        func()
+        ops += 1
+    return ops / (time.perf_counter() - start)
+
+
+def run(seconds: float, enc: str) -> list[dict]:
+    results = []
+    for engine in build_engines(enc):
+        token = engine.encrypt(sample_payload())
+        engines = {engine.alg: engine}
+
+        create_ops = measure(lambda: engine.encrypt(sample_payload()), seconds)
+        decode_ops = measure(lambda: decode_token(token, engines), seconds)
+
+        results.append(
+            {
+                "format": engine.name,
+                "alg": engine.alg,
+                "enc": engine.enc,
+                "token_bytes": len(token),
+                "create_ops_per_sec": round(create_ops, 1),
+                "decode_ops_per_sec": round(decode_ops, 1),
+            }
+        )
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--seconds", type=float, default=1.0)
+    parser.add_argument("--enc", default="A192GCM")
+    args = parser.parse_args()
+
+    print(f"{'format':<8}{'alg':<15}{'bytes':>7}{'create/s':>12}{'decode/s':>12}")
+    for r in run(args.seconds, args.enc):
+        print(
+            f"{r['format']:<8}{r['alg']:<15}{r['token_bytes']:>7}"
+            f"{r['create_ops_per_sec']:>12.1f}{r['decode_ops_per_sec']:>12.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,13 +1,30 @@
 """
-Script to generate RSA key pair for JWE token encryption
+Script to generate key material for JWE token encryption
 Run this script once to generate keys and save them to keys/ folder
+
+    python3 scripts/generate_rsa_keys.py                    # RSA only
+    python3 scripts/generate_rsa_keys.py --formats dir ecdh
 """
 
+import argparse
+import sys
 from jwcrypto import jwk
 from pathlib import Path
 
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+# Same table the token engines use, so generated keys always fit
+from app.core.tokens import SYMMETRIC_KEY_SIZES, symmetric_key_size  # noqa: E402
+
+
+def _keys_dir() -> Path:
+    base_dir = Path(__file__).parent.parent
+    keys_dir = base_dir / "keys"
+    keys_dir.mkdir(exist_ok=True)
+    return keys_dir
 
-def generate_rsa_keys():
+
+def generate_rsa_keys() -> list[Path]:
     """Generate RSA 2048-bit key pair and save to files"""
     # Generate RSA key
     key = jwk.JWK.generate(kty='RSA', size=2048)
@@ -18,29 +35,78 @@ def generate_rsa_keys():
     # Export private key (PEM format)
     private_pem = key.export_to_pem(private_key=True, password=None)
 
-    # Create keys directory
-    base_dir = Path(__file__).parent.parent
-    keys_dir = base_dir / "keys"
-    keys_dir.mkdir(exist_ok=True)
-
     # Save keys to files
+    keys_dir = _keys_dir()
     private_key_path = keys_dir / "private_key.pem"
     public_key_path = keys_dir / "public_key.pem"
 
     private_key_path.write_bytes(private_pem)
     public_key_path.write_bytes(public_pem)
 
+    return [private_key_path, public_key_path]
+
+
+def generate_symmetric_key(enc: str = "A192GCM") -> list[Path]:
+    """Generate a shared AES key (JWK JSON) for 'dir' tokens"""
+    key = jwk.JWK.generate(kty='oct', size=symmetric_key_size(enc))
+
+    secret_key_path = _keys_dir() / "secret_key.json"
+    secret_key_path.write_text(key.export(private_key=True))
+
+    return [secret_key_path]
+
+
+def generate_ec_keys() -> list[Path]:
+    """Generate EC P-256 key pair for 'ecdh' (ECDH-ES) tokens"""
+    key = jwk.JWK.generate(kty='EC', crv='P-256')
+
+    keys_dir = _keys_dir()
+    private_key_path = keys_dir / "ec_private_key.pem"
+    public_key_path = keys_dir / "ec_public_key.pem"
+
+    private_key_path.write_bytes(
+        key.export_to_pem(private_key=True, password=None))
+    public_key_path.write_bytes(key.export_to_pem())
+
+    return [private_key_path, public_key_path]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--formats",
+        nargs="+",
+        choices=["rsa", "dir", "ecdh"],
+        default=["rsa"],
+        help="Token formats to generate keys for (default: rsa)",
+    )
+    parser.add_argument(
+        "--enc",
+        choices=sorted(SYMMETRIC_KEY_SIZES),
+        default="A192GCM",
+        help="Content encryption used with 'dir' (must match APP_JWT_ENCRYPTION)",
+    )
+    args = parser.parse_args()
+
+    paths: list[Path] = []
+    if "rsa" in args.formats:
+        paths += generate_rsa_keys()
+    if "dir" in args.formats:
+        paths += generate_symmetric_key(args.enc)
+    if "ecdh" in args.formats:
+        paths += generate_ec_keys()
+
     # Print success message
     print("=" * 80)
-    print("✅ RSA Keys Generated Successfully!")
+    print("✅ Keys Generated Successfully!")
     print("=" * 80)
     print(f"\n📁 Keys saved to:")
-    print(f"   - {private_key_path}")
-    print(f"   - {public_key_path}")
+    for path in paths:
+        print(f"   - {path}")
     print("\n" + "=" * 80)
-    print("⚠️  IMPORTANT: Keep private_key.pem secure and never commit to git!")
+    print("⚠️  IMPORTANT: Keep private and secret keys secure and never commit to git!")
     print("   Add 'keys/' to .gitignore")
 
 
 if __name__ == "__main__":
-    generate_rsa_keys()
+    main()
@@ -0,0 +1,66 @@
+"""
+Every list() sort option, with and without the published / tags
+filters, must be served by an index in sort order: BlogRepository's
+startup check (verify_indexes) finds no COLLSCAN or in-memory SORT.
+
+Needs a MongoDB server (MONGO_TEST_URI, default mongodb://localhost:27017);
+skipped when none is reachable. Runs against a throwaway database.
+"""
+
+import asyncio
+import os
+import uuid
+from datetime import datetime, timedelta
+
+import pytest
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo.errors import PyMongoError
+
+from app.core import database
+from app.core.config import settings
+from app.modules.blogs.repository import BlogRepository
+
+MONGO_URI = os.environ.get("MONGO_TEST_URI", "mongodb://localhost:27017")
+
+
+def _blogs(count: int) -> list[dict]:
+    now = datetime.utcnow()
+    return [
+        {
+            "title": f"Post {i}",
+            "slug": f"post-{i}",
+            "content": "x",
+            "tags": ["python"] if i % 2 else ["go", "python"],
+            "published": i % 3 != 0,
+            "created_at": now - timedelta(minutes=i),
+            "updated_at": now - timedelta(seconds=i) if i % 4 else None,
+        }
+        for i in range(count)
+    ]
+
+
+async def _verify_indexes() -> dict[str, list[str]]:
+    database.client = AsyncIOMotorClient(MONGO_URI, serverSelectionTimeoutMS=1000)
+    try:
+        try:
+            await database.client.admin.command("ping")
+        except PyMongoError as e:
+            pytest.skip(f"MongoDB not reachable at {MONGO_URI}: {e}")
+
+        repo = BlogRepository()
+        try:
+            await repo.ensure_indexes()
+            await repo.collection.insert_many(_blogs(50))
+            return await repo.verify_indexes()
+        finally:
+            await database.client.drop_database(settings.mongo_db)
+    finally:
+        database.client.close()
+        database.client = None
+
+
+def test_every_list_shape_is_an_index_scan_in_sort_order(monkeypatch):
+    monkeypatch.setattr(
+        settings, "mongo_db", f"test_blog_indexes_{uuid.uuid4().hex[:8]}"
+    )
+    assert asyncio.run(_verify_indexes()) == {}
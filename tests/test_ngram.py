@@ -0,0 +1,97 @@
+"""
+The n-gram prefilter and the $regex confirmation in substring_filter
+must agree on one normalized form of the query. Pure functions; no
+MongoDB needed.
+"""
+
+import re
+
+import pytest
+
+from app.modules.blogs.ngram import (
+    GRAM_FIELDS,
+    NORMALIZED_FIELDS,
+    ngrams,
+    normalize,
+    search_fields,
+    substring_filter,
+)
+
+
+def _matches(document: dict, condition: dict) -> bool:
+    """Evaluate a substring_filter condition the way MongoDB would"""
+    for field, clause in condition.items():
+        if "$all" in clause:
+            if not set(clause["$all"]) <= set(document[field]):
+                return False
+        elif not re.search(clause["$regex"], document[field]):
+            return False
+    return True
+
+
+def test_ngrams_are_distinct_and_sorted():
+    assert ngrams("abcabc") == ["abc", "bca", "cab"]
+
+
+def test_ngrams_of_short_and_empty_text():
+    assert ngrams("ab") == ["ab"]
+    assert ngrams("") == []
+    assert ngrams(None) == []
+
+
+def test_ngrams_use_the_normalized_text():
+    assert ngrams("ＡＢＣ") == ngrams("abc") == ["abc"]
+    assert ngrams("A  B") == ngrams("a b")
+
+
+def test_ngrams_of_thai():
+    assert ngrams("ภาษา") == ["ภาษ", "าษา"]
+
+
+def test_search_fields_only_covers_given_fields():
+    assert search_fields({"title": "Hello"}) == {
+        "title_grams": ["ell", "hel", "llo"],
+        "title_normalized": "hello",
+    }
+    assert search_fields({"summary": None}) == {
+        "summary_grams": [],
+        "summary_normalized": "",
+    }
+    assert search_fields({"content": "x"}) == {}
+
+
+def test_substring_filter_short_query_is_regex_only():
+    assert substring_filter("title", "ab") == {"title_normalized": {"$regex": "ab"}}
+
+
+def test_substring_filter_escapes_the_query():
+    condition = substring_filter("summary", "a.b*c")
+    assert condition["summary_normalized"] == {"$regex": re.escape("a.b*c")}
+    assert condition["summary_grams"] == {"$all": ngrams("a.b*c")}
+
+
+@pytest.mark.parametrize("field", GRAM_FIELDS)
+@pytest.mark.parametrize(
+    "text, q",
+    [
+        ("Hello World", "hello"),
+        ("Hello World", "  LO   wor "),
+        ("abc def", "ＡＢＣ"),
+        ("ＡＢＣ def", "abc"),
+        ("เรียนภาษาไทยกัน", "ภาษาไทย"),
+    ],
+)
+def test_substring_filter_matches_stored_fields(field, text, q):
+    document = search_fields({field: text})
+    assert _matches(document, substring_filter(field, q))
+
+
+@pytest.mark.parametrize("q", ["hello there", "abd", "ไทยภาษา"])
+def test_substring_filter_rejects_non_substrings(q):
+    document = search_fields({"title": "Hello world ภาษาไทย abc"})
+    assert not _matches(document, substring_filter("title", q))
+
+
+def test_normalized_fields_pair_with_gram_fields():
+    assert NORMALIZED_FIELDS.keys() == GRAM_FIELDS.keys()
+    assert normalize(" Ａ\tB ") == "a b"
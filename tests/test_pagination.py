@@ -0,0 +1,96 @@
+"""
+Keyset pagination helpers: cursors round-trip every sort-key value
+(null included) and keyset_filter selects exactly the rows after the
+cursor in MongoDB sort order. Pure functions; no MongoDB needed.
+"""
+
+from datetime import datetime
+
+import pytest
+from bson import ObjectId
+
+from app.modules.blogs.pagination import (
+    DEFAULT_SORT,
+    SORT_OPTIONS,
+    decode_cursor,
+    encode_cursor,
+    keyset_filter,
+    resolve_sort,
+)
+
+IDS = [ObjectId() for _ in range(6)]
+
+
+def _matches(document: dict, condition: dict) -> bool:
+    """Evaluate a keyset_filter condition the way MongoDB would"""
+    if "$or" in condition:
+        return any(_matches(document, branch) for branch in condition["$or"])
+    for field, clause in condition.items():
+        value = document.get(field)
+        if not isinstance(clause, dict):
+            if value != clause:
+                return False
+        elif "$ne" in clause:
+            if value == clause["$ne"]:
+                return False
+        elif "$gt" in clause:
+            if value is None or not value > clause["$gt"]:
+                return False
+        elif "$lt" in clause:
+            if value is None or not value < clause["$lt"]:
+                return False
+    return True
+
+
+def _sorted(documents: list[dict], key: str, order: int) -> list[dict]:
+    """MongoDB order: nulls before any value, _id breaking ties"""
+    return sorted(
+        documents,
+        key=lambda d: (d[key] is not None, d[key] or 0, d["_id"]),
+        reverse=order == -1,
+    )
+
+
+DOCUMENTS = [
+    {"_id": IDS[0], "n": 2},
+    {"_id": IDS[1], "n": None},
+    {"_id": IDS[2], "n": 1},
+    {"_id": IDS[3], "n": 2},
+    {"_id": IDS[4], "n": None},
+    {"_id": IDS[5], "n": 3},
+]
+
+
+@pytest.mark.parametrize("value", [None, 7, "ภาษาไทย", datetime(2024, 1, 2, 3, 4, 5)])
+def test_cursor_round_trip(value):
+    _id = ObjectId()
+    cursor = encode_cursor("title_asc", value, _id)
+    assert "=" not in cursor
+    assert decode_cursor(cursor, "title_asc") == (value, _id)
+
+
+def test_cursor_from_another_sort_is_rejected():
+    cursor = encode_cursor("title_asc", "a", ObjectId())
+    with pytest.raises(ValueError, match="sort_by"):
+        decode_cursor(cursor, "title_desc")
+
+
+@pytest.mark.parametrize("cursor", ["", "not-a-cursor", encode_cursor("x", 1, 1)])
+def test_malformed_cursor_is_rejected(cursor):
+    with pytest.raises(ValueError, match="Invalid cursor"):
+        decode_cursor(cursor, "x")
+
+
+def test_unknown_sort_falls_back_to_default():
+    assert resolve_sort("bogus") == (DEFAULT_SORT, *SORT_OPTIONS[DEFAULT_SORT])
+
+
+@pytest.mark.parametrize("order", [1, -1])
+@pytest.mark.parametrize("position", range(len(DOCUMENTS)))
+def test_keyset_filter_selects_the_rest_of_the_order(order, position):
+    ordered = _sorted(DOCUMENTS, "n", order)
+    last = ordered[position]
+    condition = keyset_filter("n", order, last["n"], last["_id"])
+
+    rest = [d for d in ordered if _matches(d, condition)]
+    assert rest == ordered[position + 1 :]